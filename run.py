@@ -1,95 +1,72 @@
 import sys
 import os
 import argparse
-import numpy as np
-from src.PetriNet import PetriNet
-from src.BDD import bdd_reachable
-from src.Optimization import max_reachable_marking
-from src.BFS import bfs_reachable
-from src.DFS import dfs_reachable
-from src.Deadlock import deadlock_reachable_marking
 
-def get_weight_vector(pn, filename):
+# Các module nặng (numpy, dd, pulp, engine) chỉ được import trong phase cần tới
+# để lệnh chỉ đếm trạng thái bằng BFS khởi động nhanh.
+
+PHASES = ("reach", "deadlock", "optimize")
+ENGINE_CHOICES = ("bfs", "dfs", "bdd", "auto", "all")
+
+def get_weight_vector(pn, filename, weights_file=None):
     """
-    Hàm hỗ trợ xác định vector trọng số c dựa trên tên file
+    Đọc vector trọng số c từ file JSON.
+    Mặc định tìm `<tên file>.weights.json` cạnh file .pnml.
+    JSON có thể là dict {tên place: trọng số} hoặc list theo thứ tự place.
+    Không có file -> vector 0.
     """
+    import json
+    import numpy as np
+
     num_places = len(pn.place_names)
-    weight_map = {}
-    
-    # Chuẩn hóa tên file để so sánh (bỏ đường dẫn thư mục nếu cần)
-    base_name = os.path.basename(filename)
-
-    if "fsm.pnml" in base_name:
-        weight_map = {
-            "Done_A1": 10, "Done_A2": 10, "Done_B1": 10, "Done_B2": 10,
-            "Start_A1": -1, "Start_A2": -1, "Start_B1": -1, "Start_B2": -1,
-            "A1_In_M1": 1, "A1_In_M2": 1, "A2_In_M1": 1, "A2_In_M2": 1,
-            "B1_In_M2": 1, "B1_In_M1": 1, "B2_In_M2": 1, "B2_In_M1": 1,
-            "Res_Machine_1": 0, "Res_Machine_2": 0, "Res_Robot": 0
-        }
-    elif "hospital.pnml" in base_name:
-        weight_map = {
-            "Done_A1": 20, "Done_A2": 20, "Done_B1": 10,
-            "Start_A1": -2, "Start_A2": -2, "Start_B1": -1,
-            "A1_With_Nurse": 2, "A1_With_Doctor": 3, "A1_In_Surgery": 5,
-            "A2_With_Nurse": 2, "A2_With_Doctor": 3, "A2_In_Surgery": 5,
-            "B1_With_Nurse": 1, "B1_With_Doctor": 2,
-            "Res_Nurse_1": 0, "Res_Nurse_2": 0, "Res_Doctor": 0, "Res_SurgeryRoom": 0
-        }
-    elif "philo6.pnml" in base_name:
-        weight_map = {
-            "EAT_1": 10, "EAT_2": 10, "EAT_3": 10, 
-            "EAT_4": 10, "EAT_5": 10, "EAT_6": 10,
-            "WAIT_LEFT_FORK_1": -1, "WAIT_RIGHT_FORK_1": -1,
-            "WAIT_LEFT_FORK_2": -1, "WAIT_RIGHT_FORK_2": -1,
-            "WAIT_LEFT_FORK_3": -1, "WAIT_RIGHT_FORK_3": -1,
-            "WAIT_LEFT_FORK_4": -1, "WAIT_RIGHT_FORK_4": -1,
-            "WAIT_LEFT_FORK_5": -1, "WAIT_RIGHT_FORK_5": -1,
-            "WAIT_LEFT_FORK_6": -1, "WAIT_RIGHT_FORK_6": -1,
-            "FORK_1": 0, "FORK_2": 0, "FORK_3": 0,
-            "FORK_4": 0, "FORK_5": 0, "FORK_6": 0
-        }
-    elif "philo12.pnml" in base_name:
-        weight_map = {}
-        for i in range(12):
-            weight_map[f"Eat_{i}"] = 10
-            weight_map[f"Wait_{i}"] = -1
-            weight_map[f"Think_{i}"] = 0
-            weight_map[f"Fork_{i}"] = 0
-    elif "hotel.pnml" in base_name:
-        weight_map = {
-            "A1_In_Room_Done": 10, "A2_In_Room_Done": 10,
-            "B1_Checked_Out": 10, "B2_Checked_Out": 10,
-            "A1_Arrive_Lobby": -1, "A2_Arrive_Lobby": -1,
-            "B1_Leave_Room": -1, "B2_Leave_Room": -1,
-            "A1_At_Reception": 2, "A1_Has_Key": 3,
-            "A2_At_Reception": 2, "A2_Has_Key": 3,
-            "B1_In_Elevator": 3, "B1_Paying": 2,
-            "B2_In_Elevator": 3, "B2_Paying": 2,
-            "Res_Receptionist": 0, "Res_Elevator": 0,
-            "Res_RoomKey_101": 0, "Res_RoomKey_102": 0
-        }
-    
-    # Tạo vector c 
+    if weights_file is None:
+        weights_file = os.path.splitext(filename)[0] + ".weights.json"
+
     c = np.zeros(num_places, dtype=int)
-    for i, name in enumerate(pn.place_names):
-        c[i] = weight_map.get(name, 0)
-
-    # Xử lý override đặc biệt cho complex.pnml
-    if "complex.pnml" in base_name:
-        c_hardcoded = [-3, 1, 4, -1, 1, 0, 3, -5, 5, -4, -2, 2, 5, 4, 5, -1, 2, 0, 1, 0]
-        if len(c_hardcoded) == num_places:
-            c = np.array(c_hardcoded)
-        else:
-            # Nếu số lượng place không khớp, trả về warning trong log
-            pass 
+    if not os.path.exists(weights_file):
+        return c
+
+    with open(weights_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if isinstance(data, list):
+        # Nếu số lượng place không khớp thì bỏ qua, giữ vector 0
+        if len(data) != num_places:
+            return c
+        values = data
+    else:
+        values = [data.get(name, data.get(pn.place_ids[i], 0)) for i, name in enumerate(pn.place_names)]
 
-    return c
+    # Cả hai dạng JSON: trọng số nguyên -> vector int, có số thực -> vector float
+    return np.array(values, dtype=float if any(isinstance(v, float) for v in values) else int)
 
-def run_analysis(filename):
+def _import_phase_modules(phases):
+    """
+    Import trước các module nặng của những phase được chọn.
+    pulp giữ lại traceback khi dò solver lúc import, nên mọi frame đang chạy
+    tại thời điểm đó (kèm biến cục bộ như BDD) sẽ sống tới khi thoát chương trình.
+    Import ở đây, trước khi tạo dữ liệu lớn, để tránh giữ lại các frame phân tích.
     """
-    Chạy phân tích cho 1 file và trả về chuỗi kết quả
+    if "deadlock" in phases:
+        import src.Deadlock
+    if "optimize" in phases:
+        import src.Optimization
+
+def run_analysis(filename, phases=PHASES, engine="all", weights_file=None,
+                 bdd_backend="autoref", node_limit=None, workers=1, top_k=None, pareto=None):
     """
+    Chạy phân tích cho 1 file và trả về chuỗi kết quả.
+    `phases` chọn các bước (reach / deadlock / optimize), `engine` chọn engine
+    cho bước reach (bfs / dfs / bdd / auto = engine thắng portfolio lần trước / all).
+    `bdd_backend` / `node_limit` chọn thư viện BDD và giới hạn số node,
+    `workers` > 1 tính ảnh BDD song song theo nhóm transition.
+    `top_k` (số marking tốt nhất theo c) và `pareto` (danh sách file trọng số,
+    mỗi file một mục tiêu) bổ sung cho phase optimize, tính trên BDD reachable.
+    """
+    _import_phase_modules(phases)
+    return _analyze(filename, phases, engine, weights_file, bdd_backend, node_limit, workers, top_k, pareto)
+
+def _analyze(filename, phases, engine, weights_file, bdd_backend, node_limit, workers, top_k=None, pareto=None):
     result_log = []
     
     def log(message):
@@ -106,46 +83,190 @@ def run_analysis(filename):
             log(f"Error: File {filename} not found.")
             return "\n".join(result_log)
 
+        from src.PetriNet import PetriNet
         pn = PetriNet.from_pnml(filename)
         log("--- Petri Net Loaded ---")
         log(f"Places: {len(pn.place_names)}")
         log(f"Transitions: {len(pn.trans_ids)}")
         log(pn)
 
-        # 2. BFS
-        log("\n--- BFS Reachable Markings ---")
-        bfs_set = bfs_reachable(pn)
-        log(f"Total BFS reachable = {len(bfs_set)}")
-
-        # 3. DFS
-        log("\n--- DFS Reachable Markings ---")
-        dfs_set = dfs_reachable(pn)
-        log(f"Total DFS reachable = {len(dfs_set)}")
-
-        # 4. BDD
-        log("\n--- BDD Reachable ---")
-        bdd, count = bdd_reachable(pn)
-        log(f"BDD reachable markings = {count}")
-
-        # 5. Deadlock
-        log("\n--- Deadlock reachable marking ---")
-        dead = deadlock_reachable_marking(pn, bdd)
-        if dead is not None:
-            log(f"Deadlock marking found: {dead}")
+        if engine == "all":
+            engines = ["bfs", "dfs", "bdd"]
+        elif engine == "auto":
+            from src.Portfolio import preferred_engine
+            engines = [preferred_engine(filename) or "bfs"]
         else:
-            log("No deadlock reachable.")
+            engines = [engine]
 
-        # 6. Optimization
-        log("\n--- Optimize c·M ---")
-        c = get_weight_vector(pn, filename)
-        
-        # Chỉ hiển thị vector c nếu ngắn, dài quá thì hiển thị tóm tắt
-        
-        log(f"Weight Vector c:\n{c}")
+        bdd = None
+        bdd_count = None
+        rings = None
+        backend = None
+        explicit_set = None
+
+        def compute_bdd():
+            nonlocal bdd, bdd_count, rings, backend
+            from src.BDD import bdd_reachable
+            from src.Backend import BDDBackend, MemoryBudgetExceeded
+            log("\n--- BDD Reachable ---")
+            backend = BDDBackend(bdd_backend, node_limit=node_limit)
+            try:
+                bdd, bdd_count, rings = bdd_reachable(pn, keep_rings=True, backend=backend, workers=workers)
+            except MemoryBudgetExceeded as e:
+                log(f"BDD aborted: {e}")
+                return False
+            log(f"BDD reachable markings = {bdd_count}")
+            stats = backend.stats()
+            log(f"BDD backend = {stats['backend']}, peak live nodes = {stats['peak_nodes']}")
+            return True
+
+        def log_trace(target):
+            # Chuỗi bắn ngắn nhất từ M0 (truy vết ngược qua onion rings)
+            from src.BDD import shortest_trace
+            trace = shortest_trace(rings, target)
+            if trace is not None:
+                names = [pn.trans_names[t] or pn.trans_ids[t] for t in trace[0]]
+                log(f"Shortest trace ({len(names)} steps): {' -> '.join(names) if names else '(M0)'}")
+
+        if "reach" in phases:
+            # 2. BFS
+            if "bfs" in engines:
+                from src.BFS import bfs_reachable
+                log("\n--- BFS Reachable Markings ---")
+                bfs_set = bfs_reachable(pn)
+                log(f"Total BFS reachable = {len(bfs_set)}")
+                explicit_set = bfs_set
+
+            # 3. DFS
+            if "dfs" in engines:
+                from src.DFS import dfs_reachable
+                log("\n--- DFS Reachable Markings ---")
+                dfs_set = dfs_reachable(pn)
+                log(f"Total DFS reachable = {len(dfs_set)}")
+                if explicit_set is None:
+                    explicit_set = dfs_set
+
+            # 4. BDD
+            if "bdd" in engines:
+                compute_bdd()
+
+        # Kiểm tra deadlock cấu trúc (siphon/trap + phương trình trạng thái) trước
+        # khi duyệt: nếu đã chứng minh được thì phase deadlock không cần BDD
+        structural = None
+        if "deadlock" in phases:
+            from src.Deadlock import structural_deadlock_check, DEADLOCK_FREE
+            structural = structural_deadlock_check(pn)
+        proved_free = structural is not None and structural[0] == DEADLOCK_FREE
+
+        needs_states = "optimize" in phases or ("deadlock" in phases and not proved_free)
+        c = get_weight_vector(pn, filename, weights_file) if "optimize" in phases else None
 
-        max_mark, max_val = max_reachable_marking(pn.place_ids, bdd, c)
-        log(f"Max marking found: {max_mark}")
-        log(f"Max value (c·M): {max_val}")
+        # Đã có tập explicit: đánh giá vector hóa trên toàn bộ tập (nhanh, dùng để
+        # kiểm tra chéo BDD; nếu chưa có BDD thì dùng luôn, bỏ qua bước BDD)
+        vec = None
+        if explicit_set is not None and needs_states:
+            from src.Vectorized import evaluate_states
+            # Tập BFS/DFS sinh theo luật chỉ xét input nên deadlock cũng tính theo luật đó
+            vec = evaluate_states(pn, explicit_set, c, safe=False)
+            # Hai engine chỉ so sánh được khi có cùng tập reachable
+            comparable = bdd_count is not None and bdd_count == vec.states
+
+        # Deadlock và Optimization làm việc trên BDD reachable
+        if vec is None and bdd is None and backend is None and needs_states:
+            compute_bdd()
+        if vec is None and bdd is None and needs_states:
+            log("Skipping deadlock/optimize: no reachable BDD (memory budget exceeded).")
+            phases = [ph for ph in phases if ph == "reach" or (ph == "deadlock" and proved_free)]
+
+        if "deadlock" in phases:
+            # 5. Deadlock
+            from src.Deadlock import deadlock_reachable_marking
+            from src.PetriNet import FIRING_INPUTS, FIRING_SAFE
+            log("\n--- Deadlock reachable marking ---")
+            status, candidate = structural
+            log(f"Structural check: {status}" + (f" (candidate {candidate})" if candidate is not None else ""))
+            if proved_free:
+                log("No deadlock reachable (proved structurally).")
+            elif bdd is not None:
+                from src.Backend import MemoryBudgetExceeded
+                log(f"Firing rule: {FIRING_SAFE} (BDD: blocked when a non-input output place is marked)")
+                try:
+                    dead = deadlock_reachable_marking(pn, bdd, backend)
+                except MemoryBudgetExceeded as e:
+                    log(f"Deadlock search aborted: {e}")
+                else:
+                    if dead is not None:
+                        log(f"Deadlock marking found: {dead}")
+                        log_trace(dead[0])
+                    else:
+                        log("No deadlock reachable.")
+                    if vec is not None:
+                        from src.Vectorized import compare_deadlocks, evaluate_states
+                        if comparable:
+                            # Cùng tập marking: kiểm tra chéo theo luật bắn của BDD
+                            bdd_rule = evaluate_states(pn, explicit_set, safe=True)
+                            problem = compare_deadlocks(bdd_rule, dead)
+                            log(f"Explicit cross-check: {'OK' if problem is None else 'MISMATCH ' + problem}")
+                        else:
+                            log(f"Explicit cross-check skipped: explicit {vec.states} vs BDD {bdd_count} markings")
+            else:
+                log(f"Firing rule: {FIRING_INPUTS} (BFS/DFS: enabled when all input places are marked)")
+                log(f"Vectorized deadlocks over {vec.states} explicit markings: {len(vec.deadlocks)}")
+                if vec.deadlocks:
+                    log(f"Deadlock marking found: {vec.deadlocks}")
+                else:
+                    log("No deadlock reachable.")
+
+        if "optimize" in phases:
+            # 6. Optimization
+            from src.Optimization import max_reachable_marking
+            log("\n--- Optimize c·M ---")
+            
+            # Chỉ hiển thị vector c nếu ngắn, dài quá thì hiển thị tóm tắt
+            
+            log(f"Weight Vector c:\n{c}")
+
+            from src.Backend import MemoryBudgetExceeded
+            try:
+                if bdd is not None:
+                    max_mark, max_val = max_reachable_marking(pn.place_ids, bdd, c, backend)
+                else:
+                    max_mark, max_val = vec.max_marking, vec.max_value
+            except MemoryBudgetExceeded as e:
+                log(f"Optimization aborted: {e}")
+            else:
+                log(f"Max marking found: {max_mark}")
+                log(f"Max value (c·M): {max_val}")
+                if max_mark is not None and rings is not None:
+                    log_trace(max_mark)
+                if bdd is not None and vec is not None:
+                    if comparable:
+                        agree = vec.max_value == max_val
+                        log(f"Explicit cross-check: {'OK' if agree else f'MISMATCH explicit max {vec.max_value}'}")
+                    else:
+                        log(f"Explicit cross-check skipped: explicit {vec.states} vs BDD {bdd_count} markings")
+
+            # Top-k và Pareto front dùng chung cận/ghi nhớ theo node trên BDD reachable
+            if (top_k or pareto) and bdd is None and backend is None:
+                compute_bdd()
+            if (top_k or pareto) and bdd is None:
+                log("Skipping top-k/Pareto: no reachable BDD.")
+            if top_k and bdd is not None:
+                from src.Optimization import top_k_reachable_markings
+                log(f"\nTop {top_k} markings by c·M:")
+                for rank, (m, v) in enumerate(top_k_reachable_markings(pn.place_ids, bdd, c, top_k), 1):
+                    log(f"  {rank}. {v}: {m}")
+            if pareto and bdd is not None:
+                from src.Optimization import pareto_reachable_markings
+                missing = [f for f in pareto if not os.path.exists(f)]
+                if missing:
+                    log(f"Skipping Pareto: weight file not found: {missing}")
+                else:
+                    C = [get_weight_vector(pn, filename, f) for f in pareto]
+                    front = pareto_reachable_markings(pn.place_ids, bdd, C)
+                    log(f"\nPareto front over {pareto} ({len(front)} points):")
+                    for m, values in front:
+                        log(f"  {values}: {m}")
         
     except Exception as e:
         log(f"\nCRITICAL ERROR analyzing {filename}: {e}")
@@ -155,6 +276,257 @@ def run_analysis(filename):
     log("\n")
     return "\n".join(result_log)
 
+def run_bitstate(filename, num_bits):
+    """
+    Chạy DFS xấp xỉ (bitstate hashing) cho mạng quá lớn để duyệt chính xác
+    """
+    result_log = []
+
+    def log(message):
+        print(message)
+        result_log.append(str(message))
+
+    log("="*60)
+    log(f"BITSTATE EXPLORATION: {filename}")
+    log("="*60)
+
+    try:
+        if not os.path.exists(filename):
+            log(f"Error: File {filename} not found.")
+            return "\n".join(result_log)
+
+        from src.PetriNet import PetriNet
+        from src.Bitstate import bitstate_reachable
+        pn = PetriNet.from_pnml(filename)
+        res = bitstate_reachable(pn, num_bits=num_bits)
+        log(f"States stored = {res.states_stored}")
+        log(f"Transitions fired = {res.transitions_fired}")
+        log(f"Bit table: {res.num_bits} bits, k = {res.num_hashes}, fill = {res.fill_ratio:.4f}")
+        log(f"Hash factor (bits per stored state) = {res.hash_factor:.1f}")
+        log(f"Expected hash collisions among stored states = {res.expected_collisions:.3f}")
+        log(f"Omission probability per new state (final) = {res.omission_probability:.3e}")
+        log("Note: each collision may also drop the successors of the skipped state; "
+            "compare runs with a larger --bits to judge coverage.")
+        if res.deadlocks:
+            log(f"Deadlocks found ({len(res.deadlocks)}): {[list(d) for d in res.deadlocks]}")
+        else:
+            log("No deadlock found in explored part.")
+
+    except Exception as e:
+        log(f"\nCRITICAL ERROR analyzing {filename}: {e}")
+        import traceback
+        log(traceback.format_exc())
+
+    log("\n")
+    return "\n".join(result_log)
+
+def run_coverability(filename):
+    """
+    Cây Karp–Miller (không giả định 1-safe): kiểm tra mạng có bị chặn không,
+    cận trên của từng place và encoding phù hợp cho các engine khác
+    """
+    result_log = []
+
+    def log(message):
+        print(message)
+        result_log.append(str(message))
+
+    log("="*60)
+    log(f"COVERABILITY: {filename}")
+    log("="*60)
+
+    try:
+        if not os.path.exists(filename):
+            log(f"Error: File {filename} not found.")
+            return "\n".join(result_log)
+
+        from src.PetriNet import PetriNet
+        from src.Coverability import coverability
+        pn = PetriNet.from_pnml(filename, safe=False)
+        res = coverability(pn)
+        log(f"Nodes explored = {res.nodes_explored}, pruned = {res.nodes_pruned}" + ("" if res.complete else " (stopped at node limit)"))
+        log(f"Minimal coverability set size = {len(res.cover_set)}")
+        if res.invariant is not None:
+            log(f"Positive P-invariant: {res.invariant}")
+        log(f"Bounded: {res.bounded}, 1-safe: {res.safe}, encoding: {res.encoding()}")
+        for pid, name, b in zip(pn.place_ids, pn.place_names, res.bounds):
+            log(f"  {name or pid}: {'ω' if b is None else b}")
+        if not res.safe:
+            log("Warning: net is not 1-safe; BFS/DFS/BDD results assume 1-safe markings.")
+
+    except Exception as e:
+        log(f"\nCRITICAL ERROR analyzing {filename}: {e}")
+        import traceback
+        log(traceback.format_exc())
+
+    log("\n")
+    return "\n".join(result_log)
+
+def run_incremental(filename):
+    """
+    Phân tích BDD có lưu kết quả cạnh file model (<tên>.analysis.json / .analysis.bdd.json):
+    lần chạy sau sau khi sửa mạng chỉ phân tích lại phần thay đổi nếu được
+    """
+    result_log = []
+
+    def log(message):
+        print(message)
+        result_log.append(str(message))
+
+    log("="*60)
+    log(f"INCREMENTAL: {filename}")
+    log("="*60)
+
+    try:
+        if not os.path.exists(filename):
+            log(f"Error: File {filename} not found.")
+            return "\n".join(result_log)
+
+        import time
+        from src.PetriNet import PetriNet
+        from src.Incremental import bdd_analyze, bdd_reanalyze, load_analysis, save_analysis
+        pn = PetriNet.from_pnml(filename)
+        stem = os.path.splitext(filename)[0]
+
+        start = time.time()
+        prev = load_analysis(stem)
+        if prev is None:
+            log("No previous analysis found: full analysis.")
+            res = bdd_analyze(pn)
+        else:
+            res, diff = bdd_reanalyze(prev, pn)
+            log(f"Changes: added {diff.added}, removed {diff.removed}, changed {diff.changed}, "
+                f"places changed: {diff.places_changed}, M0 changed: {diff.m0_changed}")
+            if diff.is_empty:
+                log("No change: reused previous result.")
+            elif diff.places_changed:
+                log("Place set changed: full analysis.")
+            elif diff.only_adds_behaviour:
+                log("Only transitions added: continued fixpoint from previous reachable set.")
+            else:
+                log("Recomputed fixpoint from M0 (unchanged transition relations reused).")
+        log(f"BDD reachable markings = {res.count} ({time.time() - start:.4f}s)")
+        save_analysis(res, stem)
+        log(f"Saved analysis -> {stem}.analysis.json")
+        del res, prev
+
+    except Exception as e:
+        log(f"\nCRITICAL ERROR analyzing {filename}: {e}")
+        import traceback
+        log(traceback.format_exc())
+
+    log("\n")
+    return "\n".join(result_log)
+
+def run_export(filename, out_dir):
+    """
+    Ghi tập reachable (bit nén, .npy), đồ thị reachability (cạnh src/trans/dst, .npy)
+    và BDD reachable (.json) vào `out_dir` để công cụ khác đọc lại bằng mmap
+    """
+    result_log = []
+
+    def log(message):
+        print(message)
+        result_log.append(str(message))
+
+    log("="*60)
+    log(f"EXPORT: {filename} -> {out_dir}")
+    log("="*60)
+
+    try:
+        if not os.path.exists(filename):
+            log(f"Error: File {filename} not found.")
+            return "\n".join(result_log)
+
+        from src.PetriNet import PetriNet
+        from src.Export import bfs_export, export_bdd
+        from src.BDD import bdd_reachable
+        pn = PetriNet.from_pnml(filename)
+        os.makedirs(out_dir, exist_ok=True)
+        stem = os.path.join(out_dir, os.path.splitext(os.path.basename(filename))[0])
+
+        res = bfs_export(pn, stem + ".states.npy", stem + ".edges.npy", stem + ".meta.json")
+        log(f"States: {res.states} -> {res.states_path}")
+        log(f"Edges: {res.edges} -> {res.edges_path}")
+        log(f"Metadata -> {res.meta_path}")
+
+        R, count = bdd_reachable(pn)
+        export_bdd(R, stem + ".bdd.json", res.meta_path, count)
+        log(f"BDD ({count} markings) -> {stem}.bdd.json")
+        if count != res.states:
+            log(f"Note: BDD blocks transitions whose output places are marked, "
+                f"explicit export has {res.states} markings (see 'artifacts' in {res.meta_path})")
+        del R
+
+    except Exception as e:
+        log(f"\nCRITICAL ERROR analyzing {filename}: {e}")
+        import traceback
+        log(traceback.format_exc())
+
+    log("\n")
+    return "\n".join(result_log)
+
+def run_portfolio(filename, validate=None):
+    """
+    Chạy song song BFS/DFS/BDD, lấy kết quả đầu tiên và ghi lại engine thắng.
+    Nếu model đã có engine thắng từ lần trước (và không kiểm tra chéo) thì chỉ chạy engine đó.
+    """
+    result_log = []
+
+    def log(message):
+        print(message)
+        result_log.append(str(message))
+
+    log("="*60)
+    log(f"PORTFOLIO: {filename}")
+    log("="*60)
+
+    try:
+        if not os.path.exists(filename):
+            log(f"Error: File {filename} not found.")
+            return "\n".join(result_log)
+
+        from src.PetriNet import PetriNet
+        from src.Portfolio import ENGINES, portfolio_reachable, preferred_engine, race_engines, record_winner
+        pn = PetriNet.from_pnml(filename)
+        known = preferred_engine(filename)
+        race = known is None or validate is not None
+        if not race:
+            log(f"Using recorded winner: {known}")
+            res = portfolio_reachable(pn, engines=[known])
+        else:
+            engines = race_engines(pn)
+            excluded = [e for e in ENGINES if e not in engines]
+            if excluded:
+                log(f"Not racing {excluded}: the BDD blocks transitions whose output places are marked "
+                    f"and the net is not proved 1-safe, so its count can differ from BFS/DFS.")
+            res = portfolio_reachable(
+                pn,
+                engines,
+                cross_validate=validate is not None,
+                validate_budget=validate or 0.0,
+            )
+
+        log(f"Winner: {res.winner} ({res.elapsed:.4f}s)")
+        log(f"Reachable markings = {res.count}")
+        for engine, err in res.errors.items():
+            log(f"Engine {engine} failed: {err}")
+        if res.agree is not None:
+            log(f"Cross-validation: {'OK' if res.agree else 'MISMATCH'} {res.counts}")
+        if race:
+            if res.agree is False:
+                log("Warning: engines disagree, winner not recorded.")
+            else:
+                record_winner(filename, res)
+
+    except Exception as e:
+        log(f"\nCRITICAL ERROR analyzing {filename}: {e}")
+        import traceback
+        log(traceback.format_exc())
+
+    log("\n")
+    return "\n".join(result_log)
+
 def main():
     parser = argparse.ArgumentParser(description="Run Petri Net Analysis")
     
@@ -163,8 +535,38 @@ def main():
     
     # Thêm argument --all
     parser.add_argument("--all", action="store_true", help="Run all predefined test files and save to result.txt")
+
+    # Chế độ xấp xỉ cho mạng quá lớn
+    parser.add_argument("--bitstate", action="store_true", help="Approximate DFS with a fixed-size bit table (supertrace)")
+    parser.add_argument("--bits", type=int, default=27, help="log2 of the bit table size for --bitstate (default: 27 = 16 MiB)")
+
+    # Chạy song song các engine, lấy kết quả nhanh nhất
+    parser.add_argument("--portfolio", action="store_true", help="Race BFS, DFS (and BDD when the net is proved 1-safe) in parallel and keep the first answer")
+    parser.add_argument("--validate", type=float, metavar="SECONDS", help="With --portfolio: wait up to SECONDS for the other engines and compare counts")
+
+    # Cây phủ Karp–Miller cho mạng có thể không bị chặn
+    parser.add_argument("--coverability", action="store_true", help="Karp-Miller coverability analysis (place bounds, boundedness)")
+
+    # Phân tích lại tăng dần, lưu kết quả cạnh file model
+    parser.add_argument("--incremental", action="store_true", help="BDD analysis that reuses the saved result of the previous run on this model")
+
+    # Xuất tập reachable / đồ thị / BDD ra file nhị phân
+    parser.add_argument("--export", metavar="DIR", help="Write reachable set, edge list and BDD to DIR (.npy / .json)")
+
+    # Chọn phase / engine (mặc định chạy tất cả như trước)
+    parser.add_argument("--phase", action="append", choices=PHASES, help="Phase to run (repeatable; default: all phases)")
+    parser.add_argument("--engine", choices=ENGINE_CHOICES, default="all", help="Engine for the reach phase (auto = recorded portfolio winner)")
+    parser.add_argument("--weights", metavar="FILE", help="JSON weight vector for optimize (default: <model>.weights.json)")
+    parser.add_argument("--top-k", type=int, metavar="K", help="With optimize: also list the K reachable markings with the largest c·M")
+    parser.add_argument("--pareto", action="append", metavar="FILE", help="With optimize: Pareto front over several weight files (repeatable, one objective each)")
+
+    # Thư viện BDD và giới hạn bộ nhớ
+    parser.add_argument("--bdd-backend", choices=("autoref", "cudd", "auto"), default="autoref", help="BDD library (default: pure-Python dd.autoref)")
+    parser.add_argument("--node-limit", type=int, help="Abort the BDD phases when live nodes exceed this limit")
+    parser.add_argument("--workers", type=int, default=1, help="Processes for the BDD image computation (default: 1 = sequential)")
     
     args = parser.parse_args()
+    phases = tuple(args.phase) if args.phase else PHASES
 
     # Danh sách các file test mặc định
     test_files = [
@@ -176,7 +578,32 @@ def main():
         "pnml_file/philo12.pnml"
     ]
 
-    if args.all:
+    if args.bitstate and args.filename:
+        report = run_bitstate(args.filename, 1 << args.bits)
+        with open("result.txt", "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+
+    elif args.coverability and args.filename:
+        report = run_coverability(args.filename)
+        with open("result.txt", "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+
+    elif args.incremental and args.filename:
+        report = run_incremental(args.filename)
+        with open("result.txt", "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+
+    elif args.export and args.filename:
+        report = run_export(args.filename, args.export)
+        with open("result.txt", "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+
+    elif args.portfolio and args.filename:
+        report = run_portfolio(args.filename, args.validate)
+        with open("result.txt", "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+
+    elif args.all:
         print("Running ALL tests. Output will be saved to result.txt...")
         full_report = ""
         
@@ -185,7 +612,8 @@ def main():
             print("Warning: Directory 'pnml_file' not found. Please check paths.")
 
         for f in test_files:
-            report = run_analysis(f)
+            report = run_analysis(f, phases, args.engine, args.weights, args.bdd_backend, args.node_limit, args.workers,
+                                  args.top_k, args.pareto)
             full_report += report + "\n"
         
         # Ghi ra file
@@ -197,7 +625,8 @@ def main():
     elif args.filename:
         full_report = ""
         # Chạy 1 file cụ thể 
-        report = run_analysis(args.filename)
+        report = run_analysis(args.filename, phases, args.engine, args.weights, args.bdd_backend, args.node_limit, args.workers,
+                              args.top_k, args.pareto)
         full_report += report + "\n"
         with open("result.txt", "w", encoding="utf-8") as file:
             file.write(full_report)
@@ -211,6 +640,7 @@ def main():
         print("  Run specific file: python run.py pnml_file/fsm.pnml")
         print("  Run all tests:     python run.py --all")
         print("  Run default:       python run.py pnml_file/fsm.pnml")
+        print("  Select phases:     python run.py --phase reach --engine bfs pnml_file/fsm.pnml")
         
  
         print("\nRunning default (fsm.pnml)...")
@@ -1,6 +1,7 @@
-from dd import autoref as _bdd
 from .PetriNet import PetriNet
-from typing import Tuple, List, Dict
+from .Backend import BDDBackend, MemoryBudgetExceeded
+from dataclasses import dataclass
+from typing import Tuple, List, Dict, Optional, Union
 import time
 import sys
 
@@ -36,62 +37,11 @@ def build_BDD_dd(pn: PetriNet, bdd_manager) -> tuple:
     xp_nodes = {p: bdd_manager.var(p + "_p") for p in place_ids}
     
     num_trans = pn.I.shape[0]
-    all_places_set = set(place_ids)
 
     for t_idx in range(num_trans):
-        # Lấy input/output places
-        input_indices = [i for i, val in enumerate(pn.I[t_idx]) if val > 0]
-        output_indices = [i for i, val in enumerate(pn.O[t_idx]) if val > 0]
-        
-        if not input_indices and not output_indices:
-            continue
-            
-        input_ids = [pn.place_ids[i] for i in input_indices]
-        output_ids = [pn.place_ids[i] for i in output_indices]
-        
-        # --- Logic Enabling ---
-        # Pre-conditions: Place input phải = 1
-        enable_cond = bdd_manager.true
-        for pid in input_ids:
-            enable_cond &= x_nodes[pid]
-            
-        # 1-Safe check: Place output (nếu ko phải input) phải = 0
-        input_set = set(input_ids)
-        for pid in output_ids:
-            if pid not in input_set:
-                enable_cond &= ~x_nodes[pid]
-        
-        # --- Logic Update (Next State) ---
-        change_cond = bdd_manager.true
-        output_set = set(output_ids)
-        
-        # Input mất token -> Next = 0
-        for pid in input_ids:
-            if pid not in output_set:
-                change_cond &= ~xp_nodes[pid]
-            else:
-                change_cond &= xp_nodes[pid] # Self-loop
-        
-        # Output thêm token -> Next = 1
-        for pid in output_ids:
-            if pid not in input_set:
-                change_cond &= xp_nodes[pid]
-                
-        # --- Frame Condition (Unchanged Places) ---
-        # Những chỗ không liên quan: x' == x
-        affected = input_set | output_set
-        unaffected = all_places_set - affected
-        
-        frame_cond = bdd_manager.true
-        for pid in unaffected:
-            # x' == x  <=>  (x & x') | (!x & !x')
-            u = x_nodes[pid]
-            v = xp_nodes[pid]
-            frame_cond &= (u & v) | (~u & ~v)
-            
-        # Tổng hợp transition
-        full_trans = enable_cond & change_cond & frame_cond
-        trans_rels.append(full_trans)
+        full_trans = build_transition_rel(pn, t_idx, bdd_manager, x_nodes, xp_nodes)
+        if full_trans is not None:
+            trans_rels.append(full_trans)
 
     # 3. Initial Marking
     init_expr = bdd_manager.true
@@ -103,12 +53,122 @@ def build_BDD_dd(pn: PetriNet, bdd_manager) -> tuple:
             
     return trans_rels, init_expr, x_nodes, xp_nodes
 
-def bdd_reachable(pn: PetriNet) -> Tuple[object, int]:
+def build_transition_rel(pn: PetriNet, t_idx: int, bdd_manager, x_nodes: Dict, xp_nodes: Dict):
+    """
+    Quan hệ chuyển T_t(x, x') của một transition.
+    Trả về None nếu transition không có arc nào.
+    """
+    all_places_set = set(pn.place_ids)
+
+    # Lấy input/output places
+    input_indices = [i for i, val in enumerate(pn.I[t_idx]) if val > 0]
+    output_indices = [i for i, val in enumerate(pn.O[t_idx]) if val > 0]
+    
+    if not input_indices and not output_indices:
+        return None
+        
+    input_ids = [pn.place_ids[i] for i in input_indices]
+    output_ids = [pn.place_ids[i] for i in output_indices]
+    
+    # --- Logic Enabling ---
+    # Pre-conditions: Place input phải = 1
+    enable_cond = bdd_manager.true
+    for pid in input_ids:
+        enable_cond &= x_nodes[pid]
+        
+    # 1-Safe check: Place output (nếu ko phải input) phải = 0
+    input_set = set(input_ids)
+    for pid in output_ids:
+        if pid not in input_set:
+            enable_cond &= ~x_nodes[pid]
+    
+    # --- Logic Update (Next State) ---
+    change_cond = bdd_manager.true
+    output_set = set(output_ids)
+    
+    # Input mất token -> Next = 0
+    for pid in input_ids:
+        if pid not in output_set:
+            change_cond &= ~xp_nodes[pid]
+        else:
+            change_cond &= xp_nodes[pid] # Self-loop
+    
+    # Output thêm token -> Next = 1
+    for pid in output_ids:
+        if pid not in input_set:
+            change_cond &= xp_nodes[pid]
+            
+    # --- Frame Condition (Unchanged Places) ---
+    # Những chỗ không liên quan: x' == x
+    affected = input_set | output_set
+    unaffected = all_places_set - affected
+    
+    frame_cond = bdd_manager.true
+    for pid in unaffected:
+        # x' == x  <=>  (x & x') | (!x & !x')
+        u = x_nodes[pid]
+        v = xp_nodes[pid]
+        frame_cond &= (u & v) | (~u & ~v)
+        
+    # Tổng hợp transition
+    full_trans = enable_cond & change_cond & frame_cond
+    return full_trans
+
+def image(bdd, frontier, trans_rels, q_vars, rename_map):
+    """
+    Tính ảnh (post-image) của tập trạng thái `frontier` qua các quan hệ chuyển.
+    Trả về BDD trên biến hiện tại x.
+    """
+    accumulated_next = bdd.false
+    
+    # Partitioned Transition Relation
+    for rel in trans_rels:
+        
+        # 1. Conjunction (Giao): Trạng thái biên & Quan hệ chuyển đổi
+        conjunction = frontier & rel
+        
+        if conjunction == bdd.false:
+            continue
+            
+        # 2. Quantify (Tồn tại): Khử biến hiện tại x, chỉ giữ lại x'
+        # forall=False nghĩa là Existential Quantification
+        img = bdd.quantify(conjunction, q_vars, forall=False)
+        
+        # 3. Rename: x' -> x (Để chuẩn bị cho vòng lặp sau)
+        img_renamed = bdd.let(rename_map, img)
+        
+        accumulated_next |= img_renamed
+        
+    return accumulated_next
+
+@dataclass
+class OnionRings:
+    """
+    Các tầng BFS symbolic: rings[i] là tập marking có khoảng cách ngắn nhất
+    từ M0 đúng bằng i. Giữ kèm quan hệ chuyển để truy vết ngược.
+    """
+    bdd: object
+    rings: List[object]
+    rels: List[Tuple[int, object]]   # (chỉ số transition, quan hệ chuyển)
+    place_ids: List[str]
+
+def bdd_reachable(
+    pn: PetriNet,
+    keep_rings: bool = False,
+    backend: Optional[BDDBackend] = None,
+    workers: int = 1
+) -> Union[Tuple[object, int], Tuple[object, int, "OnionRings"]]:
     """
     Hàm chính tính toán Reachability bằng thư viện dd.
+    Trả về (R, count); nếu keep_rings=True thì trả về (R, count, OnionRings)
+    (dùng cho shortest_trace).
+    `backend` chọn thư viện BDD và giới hạn node (mặc định dd.autoref, không giới hạn);
+    vượt giới hạn sẽ raise MemoryBudgetExceeded.
+    `workers` > 1: tính ảnh song song theo nhóm transition (xem ParallelBDD.py).
     """
     # Khởi tạo BDD Manager
-    bdd = _bdd.BDD()
+    backend = backend or BDDBackend()
+    bdd = backend.bdd
     
     # Xây dựng quan hệ
     trans_rels, R, x_nodes, xp_nodes = build_BDD_dd(pn, bdd)
@@ -123,28 +183,18 @@ def bdd_reachable(pn: PetriNet) -> Tuple[object, int]:
     
     step = 0
     start_time = time.time()
+    rings = [R] if keep_rings else None
+    parallel = None
+    if workers > 1:
+        from .ParallelBDD import ParallelImage
+        parallel = ParallelImage(pn, workers, backend.name)
     
     while True:
 
-        accumulated_next = bdd.false
-        
-        # Partitioned Transition Relation
-        for rel in trans_rels:
-            
-            # 1. Conjunction (Giao): Trạng thái biên & Quan hệ chuyển đổi
-            conjunction = frontier & rel
-            
-            if conjunction == bdd.false:
-                continue
-                
-            # 2. Quantify (Tồn tại): Khử biến hiện tại x, chỉ giữ lại x'
-            # forall=False nghĩa là Existential Quantification
-            img = bdd.quantify(conjunction, q_vars, forall=False)
-            
-            # 3. Rename: x' -> x (Để chuẩn bị cho vòng lặp sau)
-            img_renamed = bdd.let(rename_map, img)
-            
-            accumulated_next |= img_renamed
+        if parallel is not None:
+            accumulated_next = parallel.image(bdd, frontier)
+        else:
+            accumulated_next = image(bdd, frontier, trans_rels, q_vars, rename_map)
             
         if accumulated_next == bdd.false:
             break
@@ -157,7 +207,17 @@ def bdd_reachable(pn: PetriNet) -> Tuple[object, int]:
             
         R |= new_states
         frontier = new_states
+        if keep_rings:
+            rings.append(new_states)
+        try:
+            backend.check()
+        except MemoryBudgetExceeded:
+            if parallel is not None:
+                parallel.terminate()
+            raise
 
+    if parallel is not None:
+        parallel.close()
     end_time = time.time()
     
     # Đếm số trạng thái
@@ -166,4 +226,68 @@ def bdd_reachable(pn: PetriNet) -> Tuple[object, int]:
     
     print(f" Finished in {end_time - start_time:.4f}")
     
-    return R, count
\ No newline at end of file
+    if keep_rings:
+        # trans_rels bỏ qua transition không có arc -> khôi phục lại chỉ số
+        rel_trans = [t for t in range(len(pn.trans_ids)) if pn.I[t].any() or pn.O[t].any()]
+        return R, count, OnionRings(bdd, rings, list(zip(rel_trans, trans_rels)), list(pn.place_ids))
+
+    return R, count
+
+def bdd_children(u) -> tuple:
+    """(low, high) của node u, đã xử lý cạnh phủ định (complement edge, dd.cudd)."""
+    lo, hi = u.low, u.high
+    if u.negated:
+        return ~lo, ~hi
+    return lo, hi
+
+def marking_to_bdd(bdd, place_ids: List[str], marking) -> object:
+    """Cube BDD của một marking đầy đủ (list/tuple 0-1 theo thứ tự place_ids)."""
+    return bdd.cube({p: bool(v) for p, v in zip(place_ids, marking)})
+
+def shortest_trace(rings: OnionRings, target) -> Optional[Tuple[List[int], List[List[int]]]]:
+    """
+    Chuỗi bắn ngắn nhất từ M0 tới một marking thuộc `target`
+    (BDD hoặc một marking dạng list 0-1), tìm ngược qua các onion ring:
+    ở mỗi tầng j chỉ cần tìm một tiền ảnh của marking hiện tại thuộc rings[j].
+    Trả về (danh sách chỉ số transition, danh sách marking từ M0 tới đích),
+    hoặc None nếu đích không reachable.
+    """
+    bdd = rings.bdd
+    place_ids = rings.place_ids
+    care_vars = set(place_ids)
+    prime_map = {p: p + "_p" for p in place_ids}
+    qp_vars = {p + "_p" for p in place_ids}
+
+    if not hasattr(target, "bdd"):
+        target = marking_to_bdd(bdd, place_ids, target)
+
+    # Tầng đầu tiên chạm tới đích
+    depth = None
+    for i, ring in enumerate(rings.rings):
+        if ring & target != bdd.false:
+            depth = i
+            break
+    if depth is None:
+        return None
+
+    def pick_marking(u) -> List[int]:
+        model = bdd.pick(u, care_vars=care_vars)
+        return [1 if model.get(p, False) else 0 for p in place_ids]
+
+    current = pick_marking(rings.rings[depth] & target)
+    markings = [current]
+    trans = []
+
+    for j in range(depth - 1, -1, -1):
+        cube_primed = bdd.let(prime_map, marking_to_bdd(bdd, place_ids, current))
+        for t_idx, rel in rings.rels:
+            pre = bdd.quantify(rel & cube_primed, qp_vars, forall=False) & rings.rings[j]
+            if pre != bdd.false:
+                current = pick_marking(pre)
+                markings.append(current)
+                trans.append(t_idx)
+                break
+
+    trans.reverse()
+    markings.reverse()
+    return trans, markings
@@ -11,31 +11,11 @@ def bfs_reachable(pn: PetriNet) -> Set[Tuple[int, ...]]:
     num_places = len(pn.place_ids)
     num_trans = len(pn.trans_ids)
 
-    # --- Chuyển Ma trận I/O sang Bitmask ---
+    # --- Chuyển Ma trận I/O và M0 sang Bitmask ---
     # Input Mask: Bit 1 tại vị trí cần token
-    input_masks = [0] * num_trans
     # Output Mask: Bit 1 tại vị trí sinh ra token
-    output_masks = [0] * num_trans
-    # Clear Mask: Những vị trí bị mất token (dùng để xóa bit cũ)
-    # Với 1-safe, ta cần xóa input trước khi thêm output
-    
-    for t in range(num_trans):
-        in_m = 0
-        out_m = 0
-        for p in range(num_places):
-            if pn.I[t, p] > 0:
-                in_m |= (1 << p)
-            if pn.O[t, p] > 0:
-                out_m |= (1 << p)
-        input_masks[t] = in_m
-        output_masks[t] = out_m
-
-    # --- 2. INITIAL STATE ---
-    # Chuyển M0 (vector) sang số nguyên (int)
-    start_state_int = 0
-    for i, val in enumerate(pn.M0):
-        if val > 0:
-            start_state_int |= (1 << i)
+    # M0 (vector) -> số nguyên (int)
+    input_masks, output_masks, start_state_int = pn.bitmasks()
 
     # --- 3. BFS LOOP (Bitwise Operations) ---
     visited_ints = {start_state_int}
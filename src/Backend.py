@@ -0,0 +1,95 @@
+from typing import Dict, Optional
+
+BACKENDS = ("autoref", "cudd", "auto")
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """Bảng node BDD vượt quá giới hạn cho phép (kể cả sau khi dọn rác)."""
+
+    def __init__(self, live_nodes: int, node_limit: int):
+        super().__init__(f"BDD memory budget exceeded: {live_nodes} live nodes > limit {node_limit}")
+        self.live_nodes = live_nodes
+        self.node_limit = node_limit
+
+
+def _load_module(name: str):
+    if name == "cudd":
+        from dd import cudd
+        return cudd
+    from dd import autoref
+    return autoref
+
+
+class BDDBackend:
+    """
+    Lớp bọc BDD manager để BDD.py / Deadlock.py / Optimization.py không phụ thuộc
+    trực tiếp vào một thư viện cụ thể.
+      - "autoref": dd.autoref, thuần Python, chạy ở mọi nơi (mặc định).
+      - "cudd":    dd.cudd (C), chỉ có khi dd được build kèm CUDD.
+      - "auto":    dùng cudd nếu import được, ngược lại autoref.
+    `node_limit` giới hạn số node sống: vượt quá thì dọn rác một lần,
+    nếu vẫn vượt thì raise MemoryBudgetExceeded.
+    """
+
+    def __init__(self, name: str = "autoref", node_limit: Optional[int] = None, reordering: bool = False):
+        if name not in BACKENDS:
+            raise ValueError(f"BDD backend không hợp lệ: {name}")
+        if name == "auto":
+            try:
+                module = _load_module("cudd")
+                name = "cudd"
+            except ImportError:
+                module = _load_module("autoref")
+                name = "autoref"
+        else:
+            try:
+                module = _load_module(name)
+            except ImportError as e:
+                raise ImportError(f"BDD backend '{name}' không khả dụng (dd chưa được build kèm CUDD?)") from e
+
+        self.name = name
+        self.node_limit = node_limit
+        self.bdd = module.BDD()
+        self.bdd.configure(reordering=reordering)
+        self.peak_nodes = 0
+        self.gc_runs = 0
+
+    def live_nodes(self) -> int:
+        return len(self.bdd)
+
+    def collect_garbage(self) -> None:
+        """
+        Dọn các node không còn được tham chiếu. dd.cudd không có hàm này
+        (CUDD tự dọn rác, len(bdd) đã không tính node chết) nên bỏ qua.
+        """
+        collect = getattr(self.bdd, "collect_garbage", None)
+        if collect is None:
+            return
+        collect()
+        self.gc_runs += 1
+
+    def reorder(self) -> None:
+        """Sắp xếp lại thứ tự biến (sifting) để thu nhỏ BDD."""
+        self.bdd.reorder()
+
+    def check(self) -> None:
+        """Gọi định kỳ trong các vòng lặp dài để áp dụng giới hạn node."""
+        n = self.live_nodes()
+        self.peak_nodes = max(self.peak_nodes, n)
+        if self.node_limit is None or n <= self.node_limit:
+            return
+        self.collect_garbage()
+        n = self.live_nodes()
+        if n > self.node_limit:
+            raise MemoryBudgetExceeded(n, self.node_limit)
+
+    def stats(self) -> Dict[str, object]:
+        s = {
+            "backend": self.name,
+            "live_nodes": self.live_nodes(),
+            "peak_nodes": max(self.peak_nodes, self.live_nodes()),
+            "node_limit": self.node_limit,
+            "gc_runs": self.gc_runs,
+        }
+        s.update(self.bdd.statistics())
+        return s
@@ -0,0 +1,138 @@
+import math
+import hashlib
+from dataclasses import dataclass, field
+from typing import List, Tuple
+from .PetriNet import PetriNet
+
+
+@dataclass
+class BitstateResult:
+    states_stored: int          # Số trạng thái được đánh dấu mới trong bảng bit
+    transitions_fired: int      # Số lần bắn transition
+    num_bits: int               # Kích thước bảng bit (m)
+    num_hashes: int             # Số hàm băm (k)
+    bits_set: int               # Số bit 1 trong bảng khi kết thúc
+    deadlocks: List[Tuple[int, ...]] = field(default_factory=list)
+
+    @property
+    def fill_ratio(self) -> float:
+        return self.bits_set / self.num_bits
+
+    @property
+    def omission_probability(self) -> float:
+        """
+        Xác suất một trạng thái mới bị coi nhầm là đã thăm (false positive)
+        tại thời điểm kết thúc: (1 - e^(-k*n/m))^k.
+        """
+        k, m, n = self.num_hashes, self.num_bits, self.states_stored
+        return (1.0 - math.exp(-k * n / m)) ** k
+
+    @property
+    def hash_factor(self) -> float:
+        """Số bit của bảng cho mỗi trạng thái đã lưu (m / n), càng lớn càng ít va chạm."""
+        return self.num_bits / max(1, self.states_stored)
+
+    @property
+    def expected_collisions(self) -> float:
+        """
+        Số lần va chạm băm kỳ vọng giữa các trạng thái đã lưu: tổng theo các lần
+        chèn thứ i của xác suất (1 - e^(-k*i/m))^k.
+        Đây KHÔNG phải ước lượng độ phủ: mỗi va chạm còn làm mất cả cây con
+        phía sau trạng thái bị bỏ qua, phần này không đo được từ một lần chạy.
+        """
+        k, m, n = self.num_hashes, self.num_bits, self.states_stored
+        if n == 0:
+            return 0.0
+        # Xấp xỉ tích phân bằng vài điểm mẫu để không phải lặp n lần
+        samples = 64
+        total = 0.0
+        for s in range(1, samples + 1):
+            i = n * s / samples
+            total += (1.0 - math.exp(-k * i / m)) ** k
+        return n * total / samples
+
+
+def _hash_indices(state: int, num_bytes: int, num_bits: int, num_hashes: int) -> List[int]:
+    """
+    Sinh k vị trí bit bằng double hashing: h_i = h1 + i*h2 (mod m).
+    h1, h2 lấy từ một digest blake2b 128-bit nên chỉ băm một lần cho mỗi trạng thái.
+    """
+    digest = hashlib.blake2b(state.to_bytes(num_bytes, "little"), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1  # h2 lẻ để không bị lặp chu kỳ ngắn
+    return [(h1 + i * h2) % num_bits for i in range(num_hashes)]
+
+
+def bitstate_reachable(
+    pn: PetriNet,
+    num_bits: int = 1 << 27,
+    num_hashes: int = 3,
+    max_deadlocks: int = 100
+) -> BitstateResult:
+    """
+    DFS xấp xỉ (supertrace / bitstate hashing) cho mạng 1-Safe.
+    Tập visited được thay bằng một bảng bit kích thước cố định (Bloom filter)
+    với k hàm băm: bộ nhớ không phụ thuộc số trạng thái, đổi lại có thể bỏ sót
+    một phần không gian trạng thái. Mọi deadlock gặp trên đường đi đều được ghi lại.
+    """
+    if num_bits <= 0 or num_hashes <= 0:
+        raise ValueError("num_bits và num_hashes phải dương")
+
+    num_places = len(pn.place_ids)
+    num_trans = len(pn.trans_ids)
+    num_bytes = max(1, (num_places + 7) // 8)
+
+    # --- 1. PRE-PROCESSING + INITIAL STATE ---
+    input_masks, output_masks, start_state_int = pn.bitmasks()
+
+    # --- 3. BẢNG BIT ---
+    table = bytearray((num_bits + 7) // 8)
+    bits_set = 0
+
+    def test_and_set(state: int) -> bool:
+        """Trả về True nếu trạng thái (có thể) đã thăm, ngược lại đánh dấu nó."""
+        nonlocal bits_set
+        seen = True
+        for idx in _hash_indices(state, num_bytes, num_bits, num_hashes):
+            byte_i, bit = idx >> 3, 1 << (idx & 7)
+            if not table[byte_i] & bit:
+                table[byte_i] |= bit
+                bits_set += 1
+                seen = False
+        return seen
+
+    # --- 4. DFS LOOP ---
+    test_and_set(start_state_int)
+    stored = 1
+    fired = 0
+    deadlocks: List[Tuple[int, ...]] = []
+    stack = [start_state_int]
+
+    while stack:
+        curr = stack.pop()
+        has_successor = False
+
+        for t in range(num_trans):
+            in_mask = input_masks[t]
+
+            # Check Enabled
+            if (curr & in_mask) == in_mask:
+                has_successor = True
+                fired += 1
+                next_state = (curr ^ in_mask) | output_masks[t]
+
+                if not test_and_set(next_state):
+                    stored += 1
+                    stack.append(next_state)
+
+        if not has_successor and len(deadlocks) < max_deadlocks:
+            deadlocks.append(tuple(1 if (curr & (1 << i)) else 0 for i in range(num_places)))
+
+    return BitstateResult(
+        states_stored=stored,
+        transitions_fired=fired,
+        num_bits=num_bits,
+        num_hashes=num_hashes,
+        bits_set=bits_set,
+        deadlocks=deadlocks,
+    )
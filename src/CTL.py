@@ -0,0 +1,188 @@
+import fnmatch
+from typing import Dict, List, Optional, Union
+from .PetriNet import PetriNet
+from .Backend import BDDBackend
+from .BDD import build_BDD_dd, image
+
+# Công thức CTL biểu diễn bằng tuple lồng nhau:
+#   "true", "false", "deadlock"
+#   "P1" / "Done_*"            -> place (theo id hoặc tên, hỗ trợ wildcard) có token
+#   ("not", f)
+#   ("and", f, g, ...), ("or", f, g, ...), ("implies", f, g)
+#   ("EX", f), ("AX", f), ("EF", f), ("AF", f), ("EG", f), ("AG", f)
+#   ("EU", f, g), ("AU", f, g)
+# Ví dụ: ("AG", ("EF", "Done_*"))  -- từ mọi marking đều có thể tới một place Done_*
+Formula = Union[str, tuple]
+
+
+def _freeze(formula) -> Formula:
+    """Đổi list lồng nhau thành tuple để công thức dùng được làm khóa cache."""
+    if isinstance(formula, (list, tuple)):
+        return tuple(_freeze(f) for f in formula)
+    return formula
+
+
+class CTLChecker:
+    """
+    Model checker CTL symbolic trên BDD của build_BDD_dd.
+    Mọi tập thỏa mãn được giới hạn trong tập reachable R, và kết quả của
+    từng công thức con được ghi nhớ nên một loạt truy vấn trên cùng mạng
+    chỉ tốn khoảng một fixpoint cho mỗi toán tử mới.
+    Marking deadlock được coi như có một self-loop (đường đi tối đại kết thúc
+    tại đó lặp lại chính nó), nên EX f / AX f tại deadlock bằng f, deadlock thỏa
+    f vẫn thỏa EG f, và AF f / A[f U g] chỉ đúng nếu mọi đường đi tới deadlock
+    đều gặp f / g trước đó.
+    """
+
+    def __init__(self, pn: PetriNet, backend: Optional[BDDBackend] = None):
+        self.pn = pn
+        self.backend = backend or BDDBackend()
+        self.bdd = self.backend.bdd
+        self.trans_rels, self.init, self.x_nodes, self.xp_nodes = build_BDD_dd(pn, self.bdd)
+
+        self.rename_map = {p + "_p": p for p in pn.place_ids}
+        self.prime_map = {p: p + "_p" for p in pn.place_ids}
+        self.q_vars = set(pn.place_ids)
+        self.qp_vars = {p + "_p" for p in pn.place_ids}
+
+        # Tập reachable (giống bdd_reachable)
+        R = self.init
+        frontier = self.init
+        while True:
+            new_states = image(self.bdd, frontier, self.trans_rels, self.q_vars, self.rename_map) & ~R
+            if new_states == self.bdd.false:
+                break
+            R |= new_states
+            frontier = new_states
+            self.backend.check()
+        self.R = R
+
+        self.cache: Dict[Formula, object] = {}
+        self.dead = self.R & ~self._pre_transitions(self.R)
+
+    # ------------------------------------------------------------------
+    # Tiền ảnh
+    # ------------------------------------------------------------------
+
+    def pre_exists(self, S):
+        """EX: các marking trong R có ít nhất một successor thuộc S (deadlock là successor của chính nó)."""
+        return self._pre_transitions(S) | (self.dead & S)
+
+    def _pre_transitions(self, S):
+        """Tiền ảnh qua các transition thật (không tính self-loop của deadlock)."""
+        bdd = self.bdd
+        S_primed = bdd.let(self.prime_map, S)
+        result = bdd.false
+        for rel in self.trans_rels:
+            conjunction = rel & S_primed
+            if conjunction == bdd.false:
+                continue
+            result |= bdd.quantify(conjunction, self.qp_vars, forall=False)
+        return result & self.R
+
+    # ------------------------------------------------------------------
+    # Các toán tử
+    # ------------------------------------------------------------------
+
+    def _atom(self, name: str):
+        bdd = self.bdd
+        if name == "true":
+            return self.R
+        if name == "false":
+            return bdd.false
+        if name == "deadlock":
+            return self.dead
+
+        matched = [
+            pid for pid, pname in zip(self.pn.place_ids, self.pn.place_names)
+            if fnmatch.fnmatchcase(pid, name) or (pname is not None and fnmatch.fnmatchcase(pname, name))
+        ]
+        if not matched:
+            raise ValueError(f"Không tìm thấy place khớp với '{name}'")
+        result = bdd.false
+        for pid in matched:
+            result |= self.x_nodes[pid]
+        return result & self.R
+
+    def _eu(self, f, g):
+        # Fixpoint nhỏ nhất: Z = g | (f & EX Z)
+        Z = g
+        while True:
+            Z_new = Z | (f & self.pre_exists(Z))
+            if Z_new == Z:
+                return Z
+            Z = Z_new
+
+    def _eg(self, f):
+        # Fixpoint lớn nhất: Z = f & EX Z
+        Z = f
+        while True:
+            Z_new = Z & self.pre_exists(Z)
+            if Z_new == Z:
+                return Z
+            Z = Z_new
+
+    def sat(self, formula: Formula):
+        """
+        Tập marking reachable thỏa mãn `formula` (BDD), có ghi nhớ.
+        Chấp nhận cả list lồng nhau (vd. công thức đọc từ JSON).
+        """
+        return self._sat(_freeze(formula))
+
+    def _sat(self, formula: Formula):
+        if formula in self.cache:
+            return self.cache[formula]
+
+        R = self.R
+        if isinstance(formula, str):
+            result = self._atom(formula)
+        else:
+            op, args = formula[0], formula[1:]
+            if op == "not":
+                result = R & ~self._sat(args[0])
+            elif op == "and":
+                result = R
+                for f in args:
+                    result &= self._sat(f)
+            elif op == "or":
+                result = self.bdd.false
+                for f in args:
+                    result |= self._sat(f)
+            elif op == "implies":
+                result = (R & ~self._sat(args[0])) | self._sat(args[1])
+            elif op == "EX":
+                result = self.pre_exists(self._sat(args[0]))
+            elif op == "AX":
+                result = R & ~self.pre_exists(R & ~self._sat(args[0]))
+            elif op == "EU":
+                result = self._eu(self._sat(args[0]), self._sat(args[1]))
+            elif op == "EF":
+                result = self._eu(R, self._sat(args[0]))
+            elif op == "EG":
+                result = self._eg(self._sat(args[0]))
+            elif op == "AF":
+                result = R & ~self._eg(R & ~self._sat(args[0]))
+            elif op == "AG":
+                result = R & ~self._eu(R, R & ~self._sat(args[0]))
+            elif op == "AU":
+                # A[f U g] = ¬(E[¬g U (¬f & ¬g)] | EG ¬g)
+                not_f = R & ~self._sat(args[0])
+                not_g = R & ~self._sat(args[1])
+                result = R & ~(self._eu(not_g, not_f & not_g) | self._eg(not_g))
+            else:
+                raise ValueError(f"Toán tử CTL không hỗ trợ: {op}")
+
+        self.cache[formula] = result
+        return result
+
+    def check(self, formula: Formula) -> bool:
+        """True nếu marking ban đầu M0 thỏa mãn `formula`."""
+        return (self.init & ~self.sat(formula)) == self.bdd.false
+
+    def check_all(self, formulas: List[Formula]) -> List[bool]:
+        """Kiểm tra một loạt tính chất, dùng chung cache công thức con."""
+        return [self.check(f) for f in formulas]
+
+    def count(self, formula: Formula) -> int:
+        """Số marking reachable thỏa mãn `formula`."""
+        return int(self.bdd.count(self.sat(formula), nvars=len(self.pn.place_ids)))
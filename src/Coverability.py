@@ -0,0 +1,268 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import numpy as np
+from .PetriNet import PetriNet
+from pulp import LpProblem, LpVariable, LpInteger, LpMaximize, LpMinimize, LpStatus, lpSum, value, PULP_CBC_CMD
+
+# ω (số token không bị chặn) biểu diễn bằng một số nguyên rất lớn để các phép so sánh
+# vector của NumPy vẫn đúng: ω >= mọi số hữu hạn, và ω - a + b vẫn được đặt lại thành ω.
+OMEGA = np.iinfo(np.int64).max // 4
+_WEIGHT_CAP = 1 << 31
+
+
+@dataclass
+class CoverabilityResult:
+    place_ids: List[str]
+    cover_set: np.ndarray           # Tập phủ tối tiểu (k x num_places), ω = OMEGA
+    nodes_explored: int             # Số node của cây đã mở rộng
+    nodes_pruned: int               # Số node bị bỏ vì đã được phủ bởi node khác
+    complete: bool = True           # False nếu dừng vì vượt max_nodes
+    bounds: List[Optional[int]] = field(default_factory=list)   # Cận trên từng place, None = ω
+    invariant: Optional[List[int]] = None                       # P-invariant dương (nếu có)
+
+    @property
+    def bounded(self) -> bool:
+        return all(b is not None for b in self.bounds)
+
+    @property
+    def safe(self) -> bool:
+        return all(b is not None and b <= 1 for b in self.bounds)
+
+    @property
+    def unbounded_places(self) -> List[str]:
+        return [pid for pid, b in zip(self.place_ids, self.bounds) if b is None]
+
+    def bits_per_place(self) -> List[Optional[int]]:
+        """Số bit cần để mã hóa từng place (None nếu không bị chặn), dùng để chọn encoding."""
+        return [None if b is None else max(1, int(b).bit_length()) for b in self.bounds]
+
+    def encoding(self) -> str:
+        """'bitmask' (1-safe, dùng được BFS/DFS/BDD hiện tại), 'counter' (bị chặn) hoặc 'unbounded'."""
+        if self.safe:
+            return "bitmask"
+        return "counter" if self.bounded else "unbounded"
+
+    def format_marking(self, m) -> List[str]:
+        return ["ω" if v >= OMEGA else str(int(v)) for v in m]
+
+
+def positive_invariant(pn: PetriNet, max_weight: int = 1000) -> Optional[np.ndarray]:
+    """
+    P-invariant nguyên dương y (y >= 1, y·C = 0) bằng ILP, None nếu không có.
+    y·M không đổi trên mọi marking reachable nên mạng chắc chắn bị chặn.
+    """
+    C = (pn.O - pn.I).T   # (places x trans)
+    num_places, num_trans = C.shape
+
+    prob = LpProblem("PositiveInvariant", LpMinimize)
+    y = [LpVariable(f"y_{p}", lowBound=1, upBound=max_weight, cat=LpInteger) for p in range(num_places)]
+    prob += lpSum(y)
+    for t in range(num_trans):
+        col = [(p, int(C[p, t])) for p in range(num_places) if C[p, t] != 0]
+        if col:
+            prob += lpSum(w * y[p] for p, w in col) == 0
+    prob.solve(PULP_CBC_CMD(msg=False))
+    if LpStatus[prob.status] != "Optimal":
+        return None
+    return np.array([int(round(v.value())) for v in y], dtype=np.int64)
+
+
+def structurally_safe(pn: PetriNet) -> bool:
+    """
+    1-safe chứng minh bằng phương trình trạng thái (arc coi như trọng số 1, giống
+    các engine bitmask): với mỗi place p, max M(p) với M = M0 + C·sigma >= 0,
+    sigma nguyên >= 0, không vượt quá 1. Phương trình trạng thái là xấp xỉ trên
+    của tập reachable nên True là chắc chắn; False chỉ là không chứng minh được.
+    Khi đó luật bắn chỉ xét input (BFS/DFS) và luật chặn output đã có token
+    (BDD) cho cùng một tập reachable.
+    """
+    C = ((pn.O > 0).astype(np.int64) - (pn.I > 0).astype(np.int64)).T   # (places x trans)
+    num_places, num_trans = C.shape
+    M0 = [min(int(v), 1) for v in pn.M0]
+
+    prob = LpProblem("StateEquationBound", LpMaximize)
+    sigma = [LpVariable(f"s_{t}", lowBound=0, cat=LpInteger) for t in range(num_trans)]
+    M = [M0[p] + lpSum(int(C[p, t]) * sigma[t] for t in range(num_trans) if C[p, t] != 0)
+         for p in range(num_places)]
+    for p in range(num_places):
+        prob += M[p] >= 0
+
+    for p in range(num_places):
+        if not C[p].any():
+            continue
+        prob.setObjective(M[p])
+        prob.solve(PULP_CBC_CMD(msg=False))
+        if LpStatus[prob.status] != "Optimal" or (value(M[p]) or 0) > 1.5:
+            return False
+    return True
+
+
+class _NodeStore:
+    """
+    Lưu các marking của cây trong một ma trận tăng dần để so sánh vector hóa.
+    Node được nhóm theo weight y·M (y > 0): m <= m' kéo theo weight(m) <= weight(m'),
+    nên chỉ node nặng hơn mới có thể phủ thật sự một marking. Khi y là P-invariant
+    mọi node cùng weight và việc kiểm tra phủ chỉ còn là tra bảng băm.
+    """
+
+    def __init__(self, num_places: int, y: np.ndarray, capacity: int = 1024):
+        self.y = y
+        self.data = np.zeros((capacity, num_places), dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.parent: List[int] = []
+        self.weights: List[int] = []
+        self.by_weight: Dict[int, List[int]] = {}
+        self.index: Dict[bytes, int] = {}
+        self.min_weight: Optional[int] = None
+        self.size = 0
+
+    def weight(self, m: np.ndarray) -> int:
+        return int(np.dot(self.y, np.minimum(m, _WEIGHT_CAP)))
+
+    def add(self, m: np.ndarray, parent: int, w: int) -> int:
+        if self.size == self.data.shape[0]:
+            self.data = np.concatenate([self.data, np.zeros_like(self.data)])
+            self.alive = np.concatenate([self.alive, np.zeros_like(self.alive)])
+        idx = self.size
+        self.data[idx] = m
+        self.alive[idx] = True
+        self.parent.append(parent)
+        self.weights.append(w)
+        self.by_weight.setdefault(w, []).append(idx)
+        self.index[m.tobytes()] = idx
+        self.min_weight = w if self.min_weight is None else min(self.min_weight, w)
+        self.size += 1
+        return idx
+
+    def kill(self, idx: int) -> None:
+        self.alive[idx] = False
+        self.index.pop(self.data[idx].tobytes(), None)
+
+    def ancestors(self, idx: int) -> List[int]:
+        path = []
+        while idx >= 0:
+            path.append(idx)
+            idx = self.parent[idx]
+        return path
+
+    def _live(self, keep) -> np.ndarray:
+        idx = np.array([i for w, lst in self.by_weight.items() if keep(w) for i in lst], dtype=np.int64)
+        return idx[self.alive[idx]] if len(idx) else idx
+
+    def covered(self, m: np.ndarray, w: int) -> bool:
+        """m nhỏ hơn hoặc bằng (theo từng place) một node đang sống nào đó."""
+        if m.tobytes() in self.index:
+            return True
+        heavier = self._live(lambda x: x > w)
+        return bool(len(heavier)) and bool((self.data[heavier] >= m).all(axis=1).any())
+
+    def dominated_by(self, m: np.ndarray, w: int) -> np.ndarray:
+        """Các node sống bị m phủ thật sự."""
+        lighter = self._live(lambda x: x < w)
+        if not len(lighter):
+            return lighter
+        return lighter[(self.data[lighter] <= m).all(axis=1)]
+
+    def maximal(self) -> np.ndarray:
+        """Các marking sống không bị marking sống khác phủ (tập phủ tối tiểu)."""
+        live = np.nonzero(self.alive[:self.size])[0]
+        weights = np.array(self.weights, dtype=object)[live]
+        order = np.argsort(weights, kind="stable")
+        rows = self.data[live[order]]
+        w_sorted = weights[order]
+        keep = []
+        for i in range(len(rows)):
+            # Chỉ phần tử nặng hơn (đứng sau trong thứ tự) mới có thể phủ rows[i]
+            j = int(np.searchsorted(w_sorted, w_sorted[i], side="right"))
+            if j < len(rows) and (rows[j:] >= rows[i]).all(axis=1).any():
+                continue
+            keep.append(i)
+        return rows[keep]
+
+
+def _accelerate(m: np.ndarray, anc: np.ndarray) -> np.ndarray:
+    """
+    Tăng tốc ω: với mỗi tổ tiên A < m, các place mà m > A có thể bơm vô hạn -> ω.
+    Lặp tới khi ổn định vì một place vừa thành ω có thể làm thêm tổ tiên khác nhỏ hơn m.
+    """
+    while True:
+        smaller = (anc <= m).all(axis=1) & (anc < m).any(axis=1)
+        if not smaller.any():
+            return m
+        grow = (anc[smaller] < m).any(axis=0) & (m < OMEGA)
+        if not grow.any():
+            return m
+        m = m.copy()
+        m[grow] = OMEGA
+
+
+def coverability(pn: PetriNet, max_nodes: Optional[int] = 1_000_000) -> CoverabilityResult:
+    """
+    Cây Karp–Miller trên ma trận I/O nguyên (không giả định 1-safe; nên đọc
+    mạng bằng PetriNet.from_pnml(filename, safe=False)).
+    Node mới bị bỏ nếu đã được phủ bởi một node sống của cây, và node chưa mở
+    rộng bị bỏ khi xuất hiện node phủ nó, nên cây nhỏ hơn nhiều so với cây
+    Karp–Miller đầy đủ. Kết quả là tập phủ tối tiểu và cận trên của từng place.
+    """
+    num_places = len(pn.place_ids)
+    I = pn.I.astype(np.int64)
+    delta = (pn.O - pn.I).astype(np.int64)
+
+    invariant = positive_invariant(pn)
+    y = invariant if invariant is not None else np.ones(num_places, dtype=np.int64)
+    store = _NodeStore(num_places, y)
+    m0 = np.asarray(pn.M0, dtype=np.int64)
+    # Duyệt theo chiều rộng để đường đi tới tổ tiên (dùng cho tăng tốc ω) ngắn
+    queue = deque([store.add(m0, -1, store.weight(m0))])
+    explored = 0
+    pruned = 0
+    complete = True
+
+    while queue:
+        idx = queue.popleft()
+        if not store.alive[idx]:
+            continue
+        if max_nodes is not None and explored >= max_nodes:
+            complete = False
+            break
+        explored += 1
+        m = store.data[idx]
+
+        # Mọi transition enabled cùng lúc: một phép so sánh ma trận
+        enabled = np.nonzero((m >= I).all(axis=1))[0]
+        if len(enabled) == 0:
+            continue
+        succs = m + delta[enabled]
+        succs[:, m >= OMEGA] = OMEGA
+
+        path = None
+        for s in succs:
+            w = store.weight(s)
+            if w > store.min_weight:
+                # Chỉ tổ tiên nhẹ hơn mới có thể nhỏ hơn s thật sự
+                path = path if path is not None else store.ancestors(idx)
+                lighter = [a for a in path if store.weights[a] < w]
+                if lighter:
+                    s = _accelerate(s, store.data[lighter])
+                    w = store.weight(s)
+            if store.covered(s, w):
+                pruned += 1
+                continue
+            # Bỏ các node sống bị s phủ (trừ tổ tiên, cần cho tăng tốc ω)
+            dominated = store.dominated_by(s, w)
+            if len(dominated):
+                path = path if path is not None else store.ancestors(idx)
+                for d in dominated:
+                    if int(d) not in path:
+                        store.kill(int(d))
+                        pruned += 1
+            queue.append(store.add(s, idx, w))
+
+    cover_set = store.maximal()
+    top = cover_set.max(axis=0)
+    bounds = [None if v >= OMEGA else int(v) for v in top]
+    return CoverabilityResult(
+        pn.place_ids, cover_set, explored, pruned, complete, bounds,
+        None if invariant is None else invariant.tolist(),
+    )
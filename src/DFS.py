@@ -9,23 +9,8 @@ def dfs_reachable(pn: PetriNet) -> Set[Tuple[int, ...]]:
     num_places = len(pn.place_ids)
     num_trans = len(pn.trans_ids)
 
-    # --- 1. PRE-PROCESSING ---
-    input_masks = [0] * num_trans
-    output_masks = [0] * num_trans
-    
-    for t in range(num_trans):
-        in_m = 0
-        out_m = 0
-        for p in range(num_places):
-            if pn.I[t, p] > 0: in_m |= (1 << p)
-            if pn.O[t, p] > 0: out_m |= (1 << p)
-        input_masks[t] = in_m
-        output_masks[t] = out_m
-
-    # --- 2. INITIAL STATE ---
-    start_state_int = 0
-    for i, val in enumerate(pn.M0):
-        if val > 0: start_state_int |= (1 << i)
+    # --- 1. PRE-PROCESSING + INITIAL STATE ---
+    input_masks, output_masks, start_state_int = pn.bitmasks()
 
     # --- 3. DFS LOOP ---
     visited_ints = {start_state_int}
@@ -1,14 +1,17 @@
 import itertools
-from typing import List, Optional, Tuple
+from typing import List, Optional, Set, Tuple
 from .PetriNet import PetriNet
-from pulp import LpProblem, LpVariable, LpBinary, LpMinimize, lpSum, PULP_CBC_CMD
+from .Backend import BDDBackend
+from pulp import LpProblem, LpVariable, LpBinary, LpMinimize, LpStatus, lpSum, PULP_CBC_CMD
 
 def deadlock_reachable_marking(
     pn: PetriNet, 
-    bdd_node  # Đây là object BDD node trả về từ bdd_reachable
+    bdd_node,  # Đây là object BDD node trả về từ bdd_reachable
+    backend: Optional[BDDBackend] = None
 ) -> Optional[List[int]]:
     """
     Tìm một trạng thái deadlock sử dụng thư viện `dd`.
+    `backend` (nếu có) là backend đã tạo ra bdd_node, dùng để áp giới hạn node.
     """
     # Lấy BDD Manager từ node
     bdd = bdd_node.bdd
@@ -26,6 +29,8 @@ def deadlock_reachable_marking(
     care_vars = set(all_vars)
     
     for assignment in bdd.pick_iter(bdd_node, care_vars=care_vars):
+        if backend is not None and count % 4096 == 0:
+            backend.check()
         # assignment là dict {var_name: True/False}
         # Cần chuyển về list [0, 1, 0...] theo thứ tự place_ids
         
@@ -102,4 +107,176 @@ def deadlock_reachable_marking(
     # [FIX] Trả về danh sách các marking deadlock
     print("Numbers of Deadlock:", len(found_deadlocks))
     return found_deadlocks
-    
\ No newline at end of file
+
+
+# ---------------------------------------------------------------------------
+# Kiểm tra cấu trúc (không duyệt không gian trạng thái)
+# ---------------------------------------------------------------------------
+
+DEADLOCK_FREE = "deadlock_free"
+CANDIDATE = "candidate"
+INCONCLUSIVE = "inconclusive"
+
+
+def _unit_weights(pn: PetriNet) -> bool:
+    """Mọi arc có trọng số 1 (giả định của các kiểm tra cấu trúc bên dưới)."""
+    return not ((pn.I > 1).any() or (pn.O > 1).any())
+
+
+def state_equation_deadlock(pn: PetriNet) -> Tuple[str, Optional[List[int]]]:
+    """
+    ILP phương trình trạng thái: M = M0 + C^T sigma, M nhị phân, sigma >= 0 nguyên,
+    và M là marking chết (mọi transition không enable hoặc bị chặn bởi 1-safe).
+    Phương trình trạng thái là xấp xỉ trên của tập reachable nên:
+      - Vô nghiệm  -> chắc chắn không có deadlock (DEADLOCK_FREE).
+      - Có nghiệm  -> chỉ là ứng viên deadlock (CANDIDATE), có thể không reachable.
+    Arc trọng số > 1 -> INCONCLUSIVE: các engine coi mọi arc là trọng số 1 nên
+    C = O - I không còn mô tả đúng luật bắn của chúng.
+    """
+    if not _unit_weights(pn):
+        return INCONCLUSIVE, None
+
+    num_places = len(pn.place_ids)
+    num_trans = len(pn.trans_ids)
+
+    prob = LpProblem("StateEquationDeadlock", LpMinimize)
+    m = [LpVariable(f"m_{p}", cat=LpBinary) for p in range(num_places)]
+    sigma = [LpVariable(f"s_{t}", lowBound=0, cat="Integer") for t in range(num_trans)]
+
+    # Ưu tiên chuỗi bắn ngắn nhất
+    prob += lpSum(sigma)
+
+    # M = M0 + C^T sigma
+    for p in range(num_places):
+        prob += m[p] == int(pn.M0[p]) + lpSum(
+            int(pn.O[t, p] - pn.I[t, p]) * sigma[t]
+            for t in range(num_trans) if pn.O[t, p] != pn.I[t, p]
+        )
+
+    # Marking chết: với mỗi t, thiếu ít nhất một input hoặc một output (không phải input) đã có token
+    for t in range(num_trans):
+        inputs = [p for p in range(num_places) if pn.I[t, p] > 0]
+        outputs = [p for p in range(num_places) if pn.O[t, p] > 0 and pn.I[t, p] == 0]
+        if not inputs and not outputs:
+            # Transition luôn bắn được -> không marking nào chết
+            return DEADLOCK_FREE, None
+        prob += lpSum(1 - m[p] for p in inputs) + lpSum(m[p] for p in outputs) >= 1
+
+    prob.solve(PULP_CBC_CMD(msg=False))
+    status = LpStatus[prob.status]
+
+    if status == "Infeasible":
+        return DEADLOCK_FREE, None
+    if status != "Optimal":
+        return INCONCLUSIVE, None
+
+    return CANDIDATE, [int(round(v.value())) for v in m]
+
+
+def _max_trap(pn: PetriNet, siphon: Set[int]) -> Set[int]:
+    """Trap lớn nhất chứa trong `siphon` (loại dần place vi phạm điều kiện trap)."""
+    num_trans = len(pn.trans_ids)
+    trap = set(siphon)
+    changed = True
+    while changed:
+        changed = False
+        for p in list(trap):
+            # Trap: mọi t lấy token từ p phải trả token về trap
+            for t in range(num_trans):
+                if pn.I[t, p] > 0 and not any(pn.O[t, q] > 0 for q in trap):
+                    trap.discard(p)
+                    changed = True
+                    break
+    return trap
+
+
+def siphon_trap_check(pn: PetriNet, max_siphons: int = 200) -> Optional[bool]:
+    """
+    Điều kiện siphon-trap: nếu mọi siphon tối tiểu đều chứa một trap có token
+    ở M0 thì không siphon nào bị rỗng -> không có marking chết (với mạng 1-safe,
+    mọi transition có input). Siphon tối tiểu được liệt kê bằng ILP
+    (cực tiểu |S|, thêm lát cắt loại các tập cha của siphon đã tìm).
+    Trả về True (thỏa), False (có siphon vi phạm), None (quá `max_siphons`).
+    """
+    num_places = len(pn.place_ids)
+    num_trans = len(pn.trans_ids)
+
+    # Transition không có input luôn enable -> điều kiện siphon không áp dụng
+    for t in range(num_trans):
+        if not any(pn.I[t, p] > 0 for p in range(num_places)):
+            return None
+
+    prob = LpProblem("MinimalSiphon", LpMinimize)
+    s = [LpVariable(f"sp_{p}", cat=LpBinary) for p in range(num_places)]
+    prob += lpSum(s)
+    prob += lpSum(s) >= 1
+
+    # Siphon: •S ⊆ S•  <=>  p ∈ S, t ∈ •p  =>  •t ∩ S ≠ ∅
+    for t in range(num_trans):
+        inputs = [q for q in range(num_places) if pn.I[t, q] > 0]
+        for p in range(num_places):
+            if pn.O[t, p] > 0:
+                prob += s[p] <= lpSum(s[q] for q in inputs)
+
+    for _ in range(max_siphons):
+        prob.solve(PULP_CBC_CMD(msg=False))
+        if LpStatus[prob.status] != "Optimal":
+            return True
+
+        siphon = {p for p in range(num_places) if s[p].value() > 0.5}
+        trap = _max_trap(pn, siphon)
+        if not any(pn.M0[p] > 0 for p in trap):
+            return False
+
+        # Loại siphon này và mọi tập cha của nó
+        prob += lpSum(s[p] for p in siphon) <= len(siphon) - 1
+
+    return None
+
+
+def _siphon_trap_applies(pn: PetriNet, known_safe: Optional[bool]) -> bool:
+    """
+    Lập luận siphon-trap giả định luật bắn thông thường với arc trọng số 1.
+    Luật bắn của repo (BDD.py, state_equation_deadlock) còn chặn transition khi
+    một place output (không phải input) đã có token, nên chỉ dùng được khi
+    không transition nào có place như vậy, hoặc khi mạng chắc chắn 1-safe
+    (khi đó việc chặn không bao giờ xảy ra).
+    """
+    if not _unit_weights(pn):
+        return False
+    if not ((pn.O > 0) & (pn.I == 0)).any():
+        return True
+    if known_safe is None:
+        known_safe = _safe_by_invariant(pn)
+    return bool(known_safe)
+
+
+def _safe_by_invariant(pn: PetriNet) -> bool:
+    """
+    1-safe chứng minh bằng P-invariant dương y: y·M = y·M0 trên mọi marking
+    reachable nên M(p) <= y·M0 / y_p, và nếu giá trị này < 2 với mọi p thì mạng 1-safe.
+    """
+    from .Coverability import positive_invariant
+    y = positive_invariant(pn)
+    if y is None:
+        return False
+    total = int(y @ pn.M0)
+    return all(total < 2 * int(w) for w in y)
+
+
+def structural_deadlock_check(pn: PetriNet, known_safe: Optional[bool] = None) -> Tuple[str, Optional[List[int]]]:
+    """
+    Kiểm tra deadlock thuần cấu trúc bằng ILP, trước khi duyệt không gian trạng thái.
+    Trả về (DEADLOCK_FREE, None), (CANDIDATE, marking) hoặc (INCONCLUSIVE, None).
+    Chỉ khi kết quả không phải DEADLOCK_FREE mới cần chạy deadlock_reachable_marking.
+    `known_safe`: mạng đã biết là 1-safe (vd. từ Coverability); None = tự kiểm tra
+    bằng P-invariant khi cần.
+    """
+    status, marking = state_equation_deadlock(pn)
+    if status == DEADLOCK_FREE:
+        return status, None
+
+    if _siphon_trap_applies(pn, known_safe) and siphon_trap_check(pn):
+        return DEADLOCK_FREE, None
+
+    return status, marking
@@ -0,0 +1,219 @@
+import json
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+from .PetriNet import PetriNet, FIRING_INPUTS, FIRING_SAFE
+
+# Header .npy (định dạng 1.0) có kích thước cố định để có thể ghi lại số dòng khi đóng file
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_NPY_HEADER_SIZE = 128
+
+EDGE_DTYPE = np.dtype([("src", "<u8"), ("trans", "<u4"), ("dst", "<u8")])
+
+
+class NpyStreamWriter:
+    """
+    Ghi một mảng .npy theo từng khối dòng mà không giữ dữ liệu trong bộ nhớ.
+    Header được giữ chỗ với kích thước cố định và ghi lại số dòng thật khi close(),
+    nên file đọc được bằng np.load(path, mmap_mode="r").
+    """
+
+    def __init__(self, path: str, dtype, row_shape: tuple = (), buffer_rows: int = 65536):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.buffer_rows = buffer_rows
+        self.rows = 0
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+        self._file = open(path, "wb")
+        self._file.write(self._header(0))
+
+    def _header(self, rows: int) -> bytes:
+        shape = (rows,) + self.row_shape
+        d = {"descr": np.lib.format.dtype_to_descr(self.dtype), "fortran_order": False, "shape": shape}
+        text = repr(d).encode("latin1")
+        pad = _NPY_HEADER_SIZE - len(_NPY_MAGIC) - 2 - len(text) - 1
+        if pad < 0:
+            raise ValueError("Header .npy vượt quá kích thước cố định")
+        text += b" " * pad + b"\n"
+        return _NPY_MAGIC + len(text).to_bytes(2, "little") + text
+
+    def append(self, block: np.ndarray) -> None:
+        block = np.ascontiguousarray(block, dtype=self.dtype)
+        if block.shape[1:] != self.row_shape:
+            raise ValueError(f"Kích thước dòng {block.shape[1:]} khác {self.row_shape}")
+        self._buffer.append(block)
+        self._buffered += len(block)
+        if self._buffered >= self.buffer_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        for block in self._buffer:
+            self._file.write(block.tobytes())
+            self.rows += len(block)
+        self._buffer = []
+        self._buffered = 0
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.seek(0)
+        self._file.write(self._header(self.rows))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class ReachableSetWriter(NpyStreamWriter):
+    """Tập reachable dạng bit nén: mỗi marking là ceil(num_places / 8) byte (bit thứ i = place i)."""
+
+    def __init__(self, path: str, num_places: int, buffer_rows: int = 65536):
+        self.num_places = num_places
+        super().__init__(path, np.uint8, ((num_places + 7) // 8,), buffer_rows)
+
+    def append_markings(self, markings: np.ndarray) -> None:
+        """markings: ma trận 0/1 (n x num_places)."""
+        self.append(np.packbits(np.asarray(markings, dtype=np.uint8), axis=1, bitorder="little"))
+
+
+class EdgeListWriter(NpyStreamWriter):
+    """Đồ thị reachability: mỗi cạnh là (chỉ số nguồn, chỉ số transition, chỉ số đích)."""
+
+    def __init__(self, path: str, buffer_rows: int = 65536):
+        super().__init__(path, EDGE_DTYPE, (), buffer_rows)
+
+
+def unpack_markings(rows: np.ndarray, num_places: int) -> np.ndarray:
+    """Ngược lại của ReachableSetWriter: bit nén -> ma trận 0/1 (n x num_places)."""
+    return np.unpackbits(rows, axis=1, count=num_places, bitorder="little")
+
+
+@dataclass
+class ExportResult:
+    states: int
+    edges: int
+    states_path: str
+    edges_path: Optional[str]
+    meta_path: str
+
+
+def write_meta(path: str, pn: PetriNet, **extra) -> None:
+    """File JSON mô tả thứ tự place/transition để đọc các file nhị phân."""
+    meta = {
+        "place_ids": list(pn.place_ids),
+        "place_names": list(pn.place_names),
+        "trans_ids": list(pn.trans_ids),
+        "trans_names": list(pn.trans_names),
+        "bit_order": "little",
+    }
+    meta.update(extra)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def add_artifact(path: str, name: str, file: str, count: int, semantics: str) -> None:
+    """Thêm mô tả một file (đường dẫn, số marking, luật bắn) vào mục "artifacts" của meta.json."""
+    with open(path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    meta.setdefault("artifacts", {})[name] = {"file": file, "states": count, "semantics": semantics}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def bfs_export(
+    pn: PetriNet,
+    states_path: str,
+    edges_path: Optional[str] = None,
+    meta_path: Optional[str] = None,
+    buffer_rows: int = 65536
+) -> ExportResult:
+    """
+    BFS bitmask (giống bfs_reachable) ghi trực tiếp ra file trong lúc duyệt:
+    marking được đánh số theo thứ tự phát hiện (dòng i của states_path),
+    mỗi lần bắn transition ghi một cạnh vào edges_path.
+    Chỉ bảng băm marking -> chỉ số nằm trong bộ nhớ, các dòng đã ghi thì không.
+    """
+    num_places = len(pn.place_ids)
+    num_trans = len(pn.trans_ids)
+    input_masks, output_masks, start = pn.bitmasks()
+
+    row_bytes = (num_places + 7) // 8
+    states = ReachableSetWriter(states_path, num_places, buffer_rows)
+    edges = EdgeListWriter(edges_path, buffer_rows) if edges_path else None
+
+    def packed(state_int: int) -> np.ndarray:
+        return np.frombuffer(state_int.to_bytes(row_bytes, "little"), dtype=np.uint8)
+
+    index = {start: 0}
+    pending_rows = [packed(start)]
+    pending_edges = []
+    queue = deque([start])
+    num_edges = 0
+
+    try:
+        while queue:
+            curr = queue.popleft()
+            src = index[curr]
+            for t in range(num_trans):
+                in_mask = input_masks[t]
+                if (curr & in_mask) == in_mask:
+                    next_state = (curr ^ in_mask) | output_masks[t]
+                    dst = index.get(next_state)
+                    if dst is None:
+                        dst = len(index)
+                        index[next_state] = dst
+                        queue.append(next_state)
+                        pending_rows.append(packed(next_state))
+                    if edges is not None:
+                        pending_edges.append((src, t, dst))
+                        num_edges += 1
+
+            if len(pending_rows) >= buffer_rows:
+                states.append(np.stack(pending_rows))
+                pending_rows = []
+            if len(pending_edges) >= buffer_rows:
+                edges.append(np.array(pending_edges, dtype=EDGE_DTYPE))
+                pending_edges = []
+
+        if pending_rows:
+            states.append(np.stack(pending_rows))
+        if edges is not None and pending_edges:
+            edges.append(np.array(pending_edges, dtype=EDGE_DTYPE))
+    finally:
+        states.close()
+        if edges is not None:
+            edges.close()
+
+    if meta_path is None:
+        meta_path = states_path + ".json"
+    artifacts = {"states": {"file": states_path, "states": len(index), "semantics": FIRING_INPUTS}}
+    if edges_path:
+        artifacts["edges"] = {"file": edges_path, "states": len(index), "edges": num_edges,
+                              "semantics": FIRING_INPUTS}
+    write_meta(meta_path, pn, states=len(index), edges=num_edges,
+               states_file=states_path, edges_file=edges_path, artifacts=artifacts)
+    return ExportResult(len(index), num_edges, states_path, edges_path, meta_path)
+
+
+def export_bdd(bdd_node, path: str, meta_path: Optional[str] = None, count: Optional[int] = None) -> None:
+    """
+    Ghi BDD reachable bằng bdd.dump (định dạng theo đuôi file: .json, .p/.pickle với autoref).
+    Nếu có meta_path, ghi thêm số marking và luật bắn của BDD (FIRING_SAFE) vào meta.json.
+    """
+    bdd_node.bdd.dump(path, roots={"reachable": bdd_node})
+    if meta_path is not None:
+        add_artifact(meta_path, "bdd", path, count, FIRING_SAFE)
+
+
+def load_bdd(bdd, path: str):
+    """Đọc lại BDD đã ghi bằng export_bdd vào manager `bdd` (đã khai báo cùng biến)."""
+    return bdd.load(path)["reachable"]
+
@@ -0,0 +1,254 @@
+import os
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from .PetriNet import PetriNet, marking_to_int
+from .Backend import BDDBackend
+from .BDD import build_BDD_dd, build_transition_rel, image
+
+
+def _arc_signature(pn: PetriNet, t_idx: int) -> tuple:
+    """Chữ ký arc của transition: (input {place: weight}, output {place: weight})."""
+    inputs = tuple(sorted((pn.place_ids[p], int(w)) for p, w in enumerate(pn.I[t_idx]) if w > 0))
+    outputs = tuple(sorted((pn.place_ids[p], int(w)) for p, w in enumerate(pn.O[t_idx]) if w > 0))
+    return inputs, outputs
+
+
+@dataclass
+class NetDiff:
+    added: List[str] = field(default_factory=list)      # Transition mới
+    removed: List[str] = field(default_factory=list)    # Transition bị xóa
+    changed: List[str] = field(default_factory=list)    # Transition đổi arc
+    places_changed: bool = False                        # Tập place khác nhau
+    m0_changed: bool = False                            # Marking ban đầu khác nhau
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed
+                    or self.places_changed or self.m0_changed)
+
+    @property
+    def only_adds_behaviour(self) -> bool:
+        """Chỉ thêm transition: tập reachable cũ vẫn reachable trong mạng mới."""
+        return not (self.removed or self.changed or self.places_changed or self.m0_changed)
+
+
+def diff_nets(old: PetriNet, new: PetriNet) -> NetDiff:
+    """So sánh hai phiên bản của mạng theo id của place/transition."""
+    diff = NetDiff()
+    diff.places_changed = list(old.place_ids) != list(new.place_ids)
+    if not diff.places_changed:
+        diff.m0_changed = any(
+            (a > 0) != (b > 0) for a, b in zip(old.M0, new.M0)
+        )
+
+    old_sigs = {tid: _arc_signature(old, t) for t, tid in enumerate(old.trans_ids)}
+    new_sigs = {tid: _arc_signature(new, t) for t, tid in enumerate(new.trans_ids)}
+
+    for tid, sig in new_sigs.items():
+        if tid not in old_sigs:
+            diff.added.append(tid)
+        elif old_sigs[tid] != sig:
+            diff.changed.append(tid)
+    diff.removed = [tid for tid in old_sigs if tid not in new_sigs]
+    return diff
+
+
+# ---------------------------------------------------------------------------
+# Symbolic (BDD)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class BDDAnalysis:
+    pn: PetriNet
+    bdd: object                 # BDD manager
+    R: object                   # BDD tập reachable
+    count: int                  # Số marking reachable
+    rels: Dict[str, tuple]      # trans_id -> (chữ ký arc, quan hệ chuyển hoặc None)
+    x_nodes: Dict
+    xp_nodes: Dict
+
+
+def _fixpoint(bdd, R, frontier, trans_rels, place_ids) -> object:
+    """Vòng lặp reachability giống bdd_reachable, bắt đầu từ (R, frontier)."""
+    rename_map = {p + "_p": p for p in place_ids}
+    q_vars = set(place_ids)
+
+    while frontier != bdd.false:
+        new_states = image(bdd, frontier, trans_rels, q_vars, rename_map) & ~R
+        if new_states == bdd.false:
+            break
+        R |= new_states
+        frontier = new_states
+    return R
+
+
+def _build(pn: PetriNet, bdd) -> tuple:
+    """build_BDD_dd một lần, gắn lại quan hệ chuyển với transition (None nếu không có arc)."""
+    trans_rels, init, x_nodes, xp_nodes = build_BDD_dd(pn, bdd)
+    it = iter(trans_rels)
+    rels = {}
+    for t, tid in enumerate(pn.trans_ids):
+        has_arcs = pn.I[t].any() or pn.O[t].any()
+        rels[tid] = (_arc_signature(pn, t), next(it) if has_arcs else None)
+    return rels, init, x_nodes, xp_nodes
+
+
+def bdd_analyze(pn: PetriNet, backend: Optional[BDDBackend] = None) -> BDDAnalysis:
+    """Phân tích đầy đủ, giữ lại mọi thứ cần cho lần phân tích lại."""
+    bdd = (backend or BDDBackend()).bdd
+    rels, init, x_nodes, xp_nodes = _build(pn, bdd)
+
+    trans_rels = [rel for _, rel in rels.values() if rel is not None]
+    R = _fixpoint(bdd, init, init, trans_rels, pn.place_ids)
+    count = int(bdd.count(R, nvars=len(pn.place_ids)))
+    return BDDAnalysis(pn, bdd, R, count, rels, x_nodes, xp_nodes)
+
+
+def save_analysis(analysis: BDDAnalysis, stem: str) -> None:
+    """
+    Lưu kết quả ra `<stem>.analysis.json` (mạng: place, transition, I/O, M0)
+    và `<stem>.analysis.bdd.json` (tập reachable, bằng bdd.dump) để lần chạy
+    run.py sau có thể phân tích lại tăng dần.
+    """
+    pn = analysis.pn
+    bdd_file = stem + ".analysis.bdd.json"
+    analysis.bdd.dump(bdd_file, roots={"reachable": analysis.R})
+    data = {
+        "place_ids": list(pn.place_ids),
+        "trans_ids": list(pn.trans_ids),
+        "place_names": list(pn.place_names),
+        "trans_names": list(pn.trans_names),
+        "I": pn.I.tolist(),
+        "O": pn.O.tolist(),
+        "M0": pn.M0.tolist(),
+        "count": analysis.count,
+        "bdd_file": os.path.basename(bdd_file),
+    }
+    with open(stem + ".analysis.json", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def load_analysis(stem: str, backend: Optional[BDDBackend] = None) -> Optional[BDDAnalysis]:
+    """Đọc lại kết quả đã lưu bằng save_analysis, None nếu chưa có hoặc file hỏng."""
+    try:
+        with open(stem + ".analysis.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    pn = PetriNet(
+        data["place_ids"], data["trans_ids"], data["place_names"], data["trans_names"],
+        np.array(data["I"], dtype=int).reshape(len(data["trans_ids"]), len(data["place_ids"])),
+        np.array(data["O"], dtype=int).reshape(len(data["trans_ids"]), len(data["place_ids"])),
+        np.array(data["M0"], dtype=int),
+    )
+    bdd = (backend or BDDBackend()).bdd
+    rels, _, x_nodes, xp_nodes = _build(pn, bdd)
+    bdd_file = os.path.join(os.path.dirname(stem), data["bdd_file"])
+    try:
+        R = bdd.load(bdd_file)["reachable"]
+    except (OSError, ValueError, KeyError):
+        return None
+    return BDDAnalysis(pn, bdd, R, data["count"], rels, x_nodes, xp_nodes)
+
+
+def bdd_reanalyze(prev: BDDAnalysis, new_pn: PetriNet) -> Tuple[BDDAnalysis, NetDiff]:
+    """
+    Phân tích lại sau khi sửa mạng.
+      - Tập place đổi: không dùng lại được gì, phân tích lại từ đầu.
+      - Chỉ thêm transition: tiếp tục fixpoint từ tập reachable cũ, biên đầu tiên
+        là ảnh của R cũ qua các transition mới.
+      - Còn lại: tính lại toàn bộ fixpoint từ M0; chỉ tiết kiệm được việc xây
+        quan hệ chuyển (transition không đổi dùng lại BDD cũ).
+    """
+    diff = diff_nets(prev.pn, new_pn)
+    if diff.places_changed:
+        return bdd_analyze(new_pn), diff
+    if diff.is_empty:
+        return BDDAnalysis(new_pn, prev.bdd, prev.R, prev.count, prev.rels,
+                           prev.x_nodes, prev.xp_nodes), diff
+
+    bdd = prev.bdd
+    rels = {}
+    for t, tid in enumerate(new_pn.trans_ids):
+        sig = _arc_signature(new_pn, t)
+        if tid in prev.rels and prev.rels[tid][0] == sig:
+            rels[tid] = prev.rels[tid]
+        else:
+            rels[tid] = (sig, build_transition_rel(new_pn, t, bdd, prev.x_nodes, prev.xp_nodes))
+
+    trans_rels = [rel for _, rel in rels.values() if rel is not None]
+    place_ids = new_pn.place_ids
+
+    if diff.only_adds_behaviour:
+        added_rels = [rels[tid][1] for tid in diff.added if rels[tid][1] is not None]
+        rename_map = {p + "_p": p for p in place_ids}
+        frontier = image(bdd, prev.R, added_rels, set(place_ids), rename_map) & ~prev.R
+        R = _fixpoint(bdd, prev.R | frontier, frontier, trans_rels, place_ids)
+    else:
+        init = bdd.true
+        for i, pid in enumerate(place_ids):
+            init &= prev.x_nodes[pid] if new_pn.M0[i] > 0 else ~prev.x_nodes[pid]
+        R = _fixpoint(bdd, init, init, trans_rels, place_ids)
+
+    count = int(bdd.count(R, nvars=len(place_ids)))
+    return BDDAnalysis(new_pn, bdd, R, count, rels, prev.x_nodes, prev.xp_nodes), diff
+
+
+# ---------------------------------------------------------------------------
+# Explicit (BFS, bitmask)
+# ---------------------------------------------------------------------------
+
+def explicit_reanalyze(
+    old_pn: PetriNet,
+    old_states: Set[Tuple[int, ...]],
+    new_pn: PetriNet
+) -> Tuple[Set[Tuple[int, ...]], NetDiff]:
+    """
+    Phiên bản explicit của bdd_reanalyze, nhận tập reachable của bfs_reachable.
+    Khi chỉ thêm transition: trạng thái cũ chỉ cần thử các transition mới,
+    trạng thái mới sinh ra thì thử mọi transition. Ngược lại chạy lại BFS.
+    """
+    from .BFS import bfs_reachable
+
+    diff = diff_nets(old_pn, new_pn)
+    if diff.is_empty:
+        return set(old_states), diff
+    if not diff.only_adds_behaviour:
+        return bfs_reachable(new_pn), diff
+
+    num_places = len(new_pn.place_ids)
+    input_masks, output_masks, _ = new_pn.bitmasks()
+    all_masks = list(zip(input_masks, output_masks))
+    added_idx = [new_pn.trans_ids.index(tid) for tid in diff.added]
+    added_masks = [all_masks[t] for t in added_idx]
+
+    visited_ints = {marking_to_int(m) for m in old_states}
+    queue = deque()
+
+    # Trạng thái cũ: chỉ transition mới có thể sinh trạng thái mới
+    for curr in list(visited_ints):
+        for in_mask, out_mask in added_masks:
+            if (curr & in_mask) == in_mask:
+                next_state = (curr ^ in_mask) | out_mask
+                if next_state not in visited_ints:
+                    visited_ints.add(next_state)
+                    queue.append(next_state)
+
+    # Trạng thái mới: BFS bình thường với mọi transition
+    while queue:
+        curr = queue.popleft()
+        for in_mask, out_mask in all_masks:
+            if (curr & in_mask) == in_mask:
+                next_state = (curr ^ in_mask) | out_mask
+                if next_state not in visited_ints:
+                    visited_ints.add(next_state)
+                    queue.append(next_state)
+
+    result_set = set()
+    for state_int in visited_ints:
+        result_set.add(tuple(1 if (state_int & (1 << i)) else 0 for i in range(num_places)))
+    return result_set, diff
@@ -3,6 +3,8 @@ import heapq
 from dataclasses import dataclass, field
 from typing import List, Optional, Set, Dict
 import pulp
+from .Backend import BDDBackend
+from .BDD import bdd_children
 
 @dataclass(order=True)
 class Node:
@@ -47,10 +49,13 @@ def solve_lp_relaxation(P: List[str], c: np.ndarray, I0: Set[str], I1: Set[str],
 def max_reachable_marking(
     place_ids: List[str], 
     bdd_node, 
-    c: np.ndarray
+    c: np.ndarray,
+    backend: Optional[BDDBackend] = None
 ) -> tuple:
     """
     Branch & Cut Optimization sử dụng thư viện `dd`.
+    `backend` (nếu có) là backend đã tạo ra bdd_node: mỗi nút nhánh tạo BDD mới
+    bằng bdd.let nên giới hạn node được kiểm tra trong vòng lặp.
     """
     # Lấy Manager từ node
     bdd = bdd_node.bdd
@@ -77,6 +82,8 @@ def max_reachable_marking(
 
     while pq:
         node = heapq.heappop(pq)
+        if backend is not None:
+            backend.check()
         
         # Pruning
         if node.ub <= best_val and best_val != float('-inf'):
@@ -91,7 +98,7 @@ def max_reachable_marking(
         # Lọc bớt assignment chỉ chứa biến có trong support để tránh lỗi (tùy phiên bản dd)
         valid_assignment = {k: v for k, v in assignment.items()} # dd thường chấp nhận tất cả
         
-        current_bdd = bdd.let(valid_assignment, bdd_node)
+        current_bdd = bdd.let(valid_assignment, bdd_node) if valid_assignment else bdd_node
 
         if current_bdd == bdd.false:
             continue
@@ -185,5 +192,228 @@ def max_reachable_marking(
         # Nhánh 0
         heapq.heappush(pq, Node(ub=current_ub, I0=new_I0 | {branch_var}, I1=new_I1))
 
-    final_val = int(best_val) if best_val != float('-inf') else None
+    if best_val == float('-inf'):
+        return best_sol, None
+    # Trọng số nguyên -> int, trọng số thực giữ nguyên phần thập phân
+    final_val = int(best_val) if float(best_val).is_integer() else float(best_val)
     return best_sol, final_val
+
+
+# ---------------------------------------------------------------------------
+# Top-k và Pareto front trực tiếp trên BDD reachable
+# ---------------------------------------------------------------------------
+
+class _BDDWalker:
+    """
+    Thông tin chung để duyệt BDD reachable theo thứ tự biến:
+    thứ tự place theo level trong BDD và vị trí (pos) của mỗi node.
+    """
+
+    def __init__(self, place_ids: List[str], bdd_node):
+        self.bdd = bdd_node.bdd
+        self.place_ids = place_ids
+        self.order = sorted(place_ids, key=self.bdd.level_of_var)
+        self.pos_of = {p: i for i, p in enumerate(self.order)}
+        self.n = len(self.order)
+        self.col = [place_ids.index(p) for p in self.order]
+
+    def pos(self, u) -> int:
+        if u == self.bdd.true or u == self.bdd.false:
+            return self.n
+        return self.pos_of[u.var]
+
+    def to_marking(self, bits: int) -> List[int]:
+        marking = [0] * self.n
+        for i in range(self.n):
+            if bits >> i & 1:
+                marking[self.col[i]] = 1
+        return marking
+
+
+class _NodeBounds:
+    """
+    best(u): giá trị c·x lớn nhất trên các biến từ pos(u) trở đi sao cho
+    BDD u đúng. Kết quả từng node được ghi nhớ trong `bounds` để dùng lại
+    giữa các lần gọi (k nghiệm, nhiều truy vấn).
+    Biến bị bỏ qua (don't care) lấy max(c, 0).
+    """
+
+    def __init__(self, walker: _BDDWalker, weights: List[float], bounds: Dict):
+        self.walker = walker
+        self.weights = weights
+        self.bounds = bounds
+        n = walker.n
+        self.suffix = [0.0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            self.suffix[i] = self.suffix[i + 1] + max(weights[i], 0)
+
+    def gap(self, i: int, j: int) -> float:
+        return self.suffix[i] - self.suffix[j]
+
+    def best(self, u) -> float:
+        bdd = self.walker.bdd
+        if u == bdd.false:
+            return float('-inf')
+        if u == bdd.true:
+            return 0.0
+        if u in self.bounds:
+            return self.bounds[u]
+        i = self.walker.pos(u)
+        lo, hi = bdd_children(u)
+        val = float('-inf')
+        for b, v in ((0, lo), (1, hi)):
+            sub = self.best(v)
+            if sub != float('-inf'):
+                val = max(val, b * self.weights[i] + self.gap(i + 1, self.walker.pos(v)) + sub)
+        self.bounds[u] = val
+        return val
+
+
+def top_k_reachable_markings(
+    place_ids: List[str],
+    bdd_node,
+    c: np.ndarray,
+    k: int,
+    cache: Optional[Dict] = None
+) -> List[tuple]:
+    """
+    k marking reachable có c·M lớn nhất, theo thứ tự giảm dần.
+    Best-first search trên BDD với cận trên chính xác của từng node
+    (tính một lần, ghi nhớ) nên mỗi nghiệm chỉ tốn O(n log) thay vì
+    một lần Branch & Cut.
+    Trả về danh sách (marking, value). `cache` có thể truyền lại giữa các lần gọi.
+    """
+    bdd = bdd_node.bdd
+    if bdd_node == bdd.false or k <= 0:
+        return []
+
+    walker = _BDDWalker(place_ids, bdd_node)
+    c_list = np.asarray(c).tolist()
+    weights = [c_list[j] for j in walker.col]
+
+    cache = {} if cache is None else cache
+    bounds = cache.setdefault(("bound", tuple(place_ids), tuple(c_list)), {})
+    nb = _NodeBounds(walker, weights, bounds)
+    best, gap = nb.best, nb.gap
+
+    n = walker.n
+    results = []
+    counter = 0
+    # Phần tử heap: (-cận trên, counter, node, pos, giá trị tích lũy, bits)
+    root_ub = gap(0, walker.pos(bdd_node)) + best(bdd_node)
+    pq = [(-root_ub, counter, bdd_node, 0, 0.0, 0)]
+
+    while pq and len(results) < k:
+        neg_ub, _, u, i, acc, bits = heapq.heappop(pq)
+
+        if i == n:
+            results.append((walker.to_marking(bits), -neg_ub))
+            continue
+
+        if i < walker.pos(u):
+            # Biến i không xuất hiện trên đường đi -> cả hai giá trị đều hợp lệ
+            branches = ((0, u), (1, u))
+        else:
+            lo, hi = bdd_children(u)
+            branches = ((0, lo), (1, hi))
+
+        for b, v in branches:
+            if v == bdd.false:
+                continue
+            new_acc = acc + b * weights[i]
+            ub = new_acc + gap(i + 1, walker.pos(v)) + best(v)
+            counter += 1
+            heapq.heappush(pq, (-ub, counter, v, i + 1, new_acc, bits | (b << i)))
+
+    return [(m, int(v) if float(v).is_integer() else v) for m, v in results]
+
+
+def _pareto_filter(points: List[tuple]) -> List[tuple]:
+    """Giữ các điểm (vector, bits) không bị trội (maximize mọi mục tiêu)."""
+    points = sorted(points, key=lambda pt: pt[0], reverse=True)
+    front = []
+    for vec, bits in points:
+        dominated = False
+        for fvec, _ in front:
+            if all(a >= b for a, b in zip(fvec, vec)):
+                dominated = True
+                break
+        if not dominated:
+            front.append((vec, bits))
+    return front
+
+
+class _ParetoDP:
+    """
+    suffix_front(u): Pareto set (vector mục tiêu, bits) của phần đuôi từ pos(u),
+    ghi nhớ theo node trong `memo`.
+    """
+
+    def __init__(self, walker: _BDDWalker, cols: List[tuple], num_obj: int, memo: Dict):
+        self.walker = walker
+        self.cols = cols
+        self.zero = tuple([0] * num_obj)
+        self.memo = memo
+
+    @staticmethod
+    def add(vec: tuple, w: tuple) -> tuple:
+        return tuple(a + b for a, b in zip(vec, w))
+
+    def pad(self, front: List[tuple], i: int, j: int) -> List[tuple]:
+        """Mở rộng front qua các biến don't care ở vị trí i..j-1."""
+        for pos in range(j - 1, i - 1, -1):
+            front = _pareto_filter(
+                front + [(self.add(vec, self.cols[pos]), bits | (1 << pos)) for vec, bits in front]
+            )
+        return front
+
+    def suffix_front(self, u) -> List[tuple]:
+        bdd = self.walker.bdd
+        if u == bdd.false:
+            return []
+        if u == bdd.true:
+            return [(self.zero, 0)]
+        if u in self.memo:
+            return self.memo[u]
+        i = self.walker.pos(u)
+        lo, hi = bdd_children(u)
+        points = []
+        for b, v in ((0, lo), (1, hi)):
+            sub = self.pad(self.suffix_front(v), i + 1, self.walker.pos(v))
+            if b:
+                points += [(self.add(vec, self.cols[i]), bits | (1 << i)) for vec, bits in sub]
+            else:
+                points += sub
+        front = _pareto_filter(points)
+        self.memo[u] = front
+        return front
+
+
+def pareto_reachable_markings(
+    place_ids: List[str],
+    bdd_node,
+    C: np.ndarray,
+    cache: Optional[Dict] = None
+) -> List[tuple]:
+    """
+    Pareto front của các marking reachable theo nhiều hàm mục tiêu
+    (mỗi hàng của C là một vector trọng số, maximize tất cả).
+    Quy hoạch động trên BDD: mỗi node lưu Pareto set của phần đuôi,
+    được ghi nhớ nên mọi mục tiêu dùng chung một lần duyệt.
+    Trả về danh sách (marking, [giá trị từng mục tiêu]), mỗi vector một marking đại diện.
+    """
+    bdd = bdd_node.bdd
+    if bdd_node == bdd.false:
+        return []
+
+    walker = _BDDWalker(place_ids, bdd_node)
+    C_list = np.atleast_2d(np.asarray(C)).tolist()
+    num_obj = len(C_list)
+    cols = [tuple(row[j] for row in C_list) for j in walker.col]
+
+    cache = {} if cache is None else cache
+    memo = cache.setdefault(("pareto", tuple(place_ids), tuple(map(tuple, C_list))), {})
+
+    pf = _ParetoDP(walker, cols, num_obj, memo)
+    front = pf.pad(pf.suffix_front(bdd_node), 0, walker.pos(bdd_node))
+    return [(walker.to_marking(bits), list(vec)) for vec, bits in front]
@@ -0,0 +1,135 @@
+import multiprocessing as mp
+from typing import Dict, List, Optional, Tuple
+from .PetriNet import PetriNet
+from .Backend import BDDBackend
+from .BDD import bdd_children, build_transition_rel, image
+
+# Dạng tuần tự hóa của một BDD: danh sách node (biến, ref low, ref high) theo thứ tự
+# con trước cha, cùng ref của gốc. Ref 0 = false, 1 = true, k + 2 = node thứ k.
+# Cạnh phủ định được khai triển nên dạng này không phụ thuộc thư viện (autoref / cudd).
+SerializedBDD = Tuple[List[Tuple[str, int, int]], int]
+
+FALSE_REF = 0
+TRUE_REF = 1
+
+
+def serialize_bdd(bdd, u) -> SerializedBDD:
+    """Duyệt DAG của u (không đệ quy) và trả về danh sách node gọn để gửi qua tiến trình khác."""
+    refs: Dict[object, int] = {bdd.false: FALSE_REF, bdd.true: TRUE_REF}
+    nodes: List[Tuple[str, int, int]] = []
+    stack = [u]
+    while stack:
+        v = stack[-1]
+        if v in refs:
+            stack.pop()
+            continue
+        lo, hi = bdd_children(v)
+        pending = [w for w in (lo, hi) if w not in refs]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        refs[v] = len(nodes) + 2
+        nodes.append((v.var, refs[lo], refs[hi]))
+    return nodes, refs[u]
+
+
+def deserialize_bdd(bdd, data: SerializedBDD):
+    """Dựng lại BDD trong manager `bdd` (đã khai báo cùng tên biến) bằng bdd.ite."""
+    nodes, root = data
+    built = [bdd.false, bdd.true]
+    for var, lo, hi in nodes:
+        built.append(bdd.ite(bdd.var(var), built[hi], built[lo]))
+    return built[root]
+
+
+def cluster_transitions(pn: PetriNet, num_clusters: int) -> List[List[int]]:
+    """
+    Chia các transition có arc thành `num_clusters` nhóm liên tiếp theo place
+    nhỏ nhất mà chúng chạm tới (các transition gần nhau dùng chung biến nên ảnh
+    từng phần nhỏ hơn), cân bằng theo số arc.
+    """
+    trans = [t for t in range(len(pn.trans_ids)) if pn.I[t].any() or pn.O[t].any()]
+    trans.sort(key=lambda t: min(list((pn.I[t] > 0).nonzero()[0]) + list((pn.O[t] > 0).nonzero()[0])))
+    arcs = {t: int((pn.I[t] > 0).sum() + (pn.O[t] > 0).sum()) for t in trans}
+
+    num_clusters = max(1, min(num_clusters, len(trans)))
+    target = sum(arcs.values()) / num_clusters
+    clusters: List[List[int]] = [[]]
+    load = 0
+    for t in trans:
+        if load >= target and len(clusters) < num_clusters:
+            clusters.append([])
+            load = 0
+        clusters[-1].append(t)
+        load += arcs[t]
+    return [c for c in clusters if c]
+
+
+class _WorkerState:
+    """BDD manager riêng của một tiến trình con và quan hệ chuyển của mọi transition."""
+
+    def __init__(self, pn: PetriNet, backend_name: str):
+        self.backend = BDDBackend(backend_name)
+        bdd = self.backend.bdd
+        ordered_vars = []
+        for p in pn.place_ids:
+            ordered_vars.append(p)
+            ordered_vars.append(p + "_p")
+        bdd.declare(*ordered_vars)
+        x_nodes = {p: bdd.var(p) for p in pn.place_ids}
+        xp_nodes = {p: bdd.var(p + "_p") for p in pn.place_ids}
+        self.rels = {t: build_transition_rel(pn, t, bdd, x_nodes, xp_nodes) for t in range(len(pn.trans_ids))}
+        self.rename_map = {p + "_p": p for p in pn.place_ids}
+        self.q_vars = set(pn.place_ids)
+
+
+_worker: Optional[_WorkerState] = None
+
+
+def _init_worker(pn: PetriNet, backend_name: str) -> None:
+    global _worker
+    _worker = _WorkerState(pn, backend_name)
+
+
+def _image_task(args) -> SerializedBDD:
+    """Ảnh từng phần của frontier qua một nhóm transition, tính trong tiến trình con."""
+    cluster, frontier_data = args
+    bdd = _worker.backend.bdd
+    frontier = deserialize_bdd(bdd, frontier_data)
+    rels = [_worker.rels[t] for t in cluster if _worker.rels[t] is not None]
+    result = image(bdd, frontier, rels, _worker.q_vars, _worker.rename_map)
+    data = serialize_bdd(bdd, result)
+    del frontier, result, rels
+    return data
+
+
+class ParallelImage:
+    """
+    Tính ảnh symbolic song song: mỗi nhóm transition là một tác vụ trong process
+    pool, các tiến trình con có BDD manager riêng, frontier và ảnh từng phần được
+    trao đổi dưới dạng serialize_bdd và hợp lại trong manager chính.
+    """
+
+    def __init__(self, pn: PetriNet, workers: int, backend_name: str = "autoref",
+                 clusters: Optional[List[List[int]]] = None):
+        self.clusters = clusters or cluster_transitions(pn, workers)
+        self.pool = mp.Pool(processes=min(workers, len(self.clusters)),
+                            initializer=_init_worker, initargs=(pn, backend_name))
+
+    def image(self, bdd, frontier):
+        """Giống BDD.image(bdd, frontier, trans_rels, ...) nhưng chia theo nhóm transition."""
+        frontier_data = serialize_bdd(bdd, frontier)
+        parts = self.pool.map(_image_task, [(c, frontier_data) for c in self.clusters])
+        result = bdd.false
+        for data in parts:
+            result |= deserialize_bdd(bdd, data)
+        return result
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+
+    def terminate(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
@@ -1,7 +1,21 @@
 import numpy as np
 import xml.etree.ElementTree as ET
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 
+# Luật bắn của các engine: BFS/DFS (bitmask) chỉ xét input, còn BDD (BDD.py,
+# Deadlock.py) chặn thêm transition khi place output không phải input đã có token.
+# Hai luật cho cùng tập reachable khi mạng 1-safe.
+FIRING_INPUTS = "inputs"
+FIRING_SAFE = "inputs+empty-outputs"
+
+
+def marking_to_int(marking) -> int:
+    """Marking (dãy số token) -> bitmask: bit i = 1 khi place i có token."""
+    state = 0
+    for i, val in enumerate(marking):
+        if val > 0:
+            state |= (1 << i)
+    return state
 
 class PetriNet:
     def __init__(
@@ -23,8 +37,10 @@ class PetriNet:
         self.M0 = M0
 
     @classmethod
-    def from_pnml(cls, filename: str) -> "PetriNet":
+    def from_pnml(cls, filename: str, safe: bool = True) -> "PetriNet":
         # Đọc file PNML
+        # safe=True: coi mạng là 1-safe, marking ban đầu > 0 được đưa về 1.
+        # safe=False: giữ nguyên số token (dùng cho Coverability.py).
         tree = ET.parse(filename)
         root = tree.getroot()
 
@@ -75,7 +91,10 @@ class PetriNet:
                             marking_val = 0
                     break
             # 1-safe → >0 token coi như 1
-            initial_tokens[pid] = 1 if marking_val > 0 else 0
+            if safe:
+                initial_tokens[pid] = 1 if marking_val > 0 else 0
+            else:
+                initial_tokens[pid] = max(marking_val, 0)
 
         place_index = {pid: i for i, pid in enumerate(place_ids)}
 
@@ -158,6 +177,16 @@ class PetriNet:
             M0=M0,
         )
 
+    def bitmasks(self) -> Tuple[List[int], List[int], int]:
+        """
+        Ma trận I/O và M0 dạng bitmask cho các engine explicit (BFS, DFS, Stream,
+        Bitstate, Export, Incremental): input_masks[t] / output_masks[t] có bit p = 1
+        khi arc tồn tại (mọi trọng số coi như 1), cùng marking ban đầu.
+        """
+        input_masks = [marking_to_int(row) for row in self.I]
+        output_masks = [marking_to_int(row) for row in self.O]
+        return input_masks, output_masks, marking_to_int(self.M0)
+
     def __str__(self) -> str:
         s = []
         s.append("Places: " + str(self.place_ids))
@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import hashlib
+import queue as _queue
+import multiprocessing as mp
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple
+from .PetriNet import PetriNet, FIRING_INPUTS, FIRING_SAFE
+
+ENGINES = ("bfs", "dfs", "bdd")
+FIRING_RULE = {"bfs": FIRING_INPUTS, "dfs": FIRING_INPUTS, "bdd": FIRING_SAFE}
+HISTORY_FILE = ".portfolio_history.json"
+
+
+@dataclass
+class PortfolioResult:
+    winner: str                                 # Engine trả lời đầu tiên
+    count: int                                  # Số marking reachable của engine thắng
+    elapsed: float                              # Thời gian tới khi có câu trả lời đầu tiên
+    counts: Dict[str, int] = field(default_factory=dict)       # Kết quả mọi engine kịp xong
+    times: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    agree: Optional[bool] = None                # None nếu không kiểm tra chéo được
+
+    @property
+    def disagreeing(self) -> Dict[str, int]:
+        return {e: c for e, c in self.counts.items() if c != self.count}
+
+
+def race_engines(pn: PetriNet) -> Tuple[str, ...]:
+    """
+    Các engine có cùng câu trả lời trên `pn`: cả ba nếu luật bắn của BFS/DFS và BDD
+    trùng nhau (không transition nào có output ngoài input, hoặc mạng chứng minh
+    được 1-safe), ngược lại chỉ BFS/DFS để kết quả không phụ thuộc engine thắng.
+    """
+    if not ((pn.O > 0) & (pn.I == 0)).any():
+        return ENGINES
+    from .Coverability import structurally_safe
+    if structurally_safe(pn):
+        return ENGINES
+    return tuple(e for e in ENGINES if FIRING_RULE[e] == FIRING_INPUTS)
+
+
+def _count_states(engine: str, pn: PetriNet) -> int:
+    if engine == "bfs":
+        from .BFS import bfs_reachable
+        return len(bfs_reachable(pn))
+    if engine == "dfs":
+        from .DFS import dfs_reachable
+        return len(dfs_reachable(pn))
+    if engine == "bdd":
+        from .BDD import bdd_reachable
+        return bdd_reachable(pn)[1]
+    raise ValueError(f"Engine không hợp lệ: {engine}")
+
+
+def _worker(engine: str, pn: PetriNet, out) -> None:
+    """Chạy trong tiến trình con, gửi (engine, count, thời gian, lỗi) về tiến trình chính."""
+    start = time.time()
+    try:
+        count = _count_states(engine, pn)
+        out.put((engine, count, time.time() - start, None))
+    except Exception as e:  # Gửi lỗi về thay vì làm treo tiến trình chính
+        out.put((engine, None, time.time() - start, f"{type(e).__name__}: {e}"))
+
+
+def model_key(filename: str) -> str:
+    """Khóa của model trong lịch sử: đường dẫn + hash nội dung (sửa file -> khóa mới)."""
+    with open(filename, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:16]
+    return f"{os.path.abspath(filename)}:{digest}"
+
+
+def _load_history(path: str) -> Dict[str, dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def preferred_engine(filename: str, history: str = HISTORY_FILE) -> Optional[str]:
+    """Engine đã thắng lần trước với đúng model này (nếu có)."""
+    entry = _load_history(history).get(model_key(filename))
+    return entry["winner"] if entry else None
+
+
+def record_winner(filename: str, result: PortfolioResult, history: str = HISTORY_FILE) -> None:
+    data = _load_history(history)
+    data[model_key(filename)] = {
+        "winner": result.winner,
+        "elapsed": round(result.elapsed, 4),
+        "count": result.count,
+    }
+    with open(history, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def _next_result(out, procs, pending, errors, deadline: Optional[float]):
+    """
+    Chờ kết quả tiếp theo từ hàng đợi, đồng thời theo dõi tiến trình con:
+    engine chết mà không gửi gì (bị OOM kill, segfault) được ghi vào `errors`
+    và bỏ khỏi `pending` thay vì chờ mãi. Trả về None khi hết hạn hoặc hết engine.
+    """
+    while pending:
+        wait = 0.1 if deadline is None else min(0.1, max(0.0, deadline - time.time()))
+        try:
+            return out.get(timeout=wait)
+        except _queue.Empty:
+            pass
+        for engine in list(pending):
+            proc = procs[engine]
+            if proc.is_alive():
+                continue
+            # Đã kết thúc: kết quả (nếu có) đã nằm trong pipe, đọc nốt trước khi kết luận
+            try:
+                return out.get(timeout=0.5)
+            except _queue.Empty:
+                pending.discard(engine)
+                errors[engine] = f"process exited without result (exit code {proc.exitcode})"
+        if deadline is not None and time.time() >= deadline:
+            return None
+    return None
+
+
+def portfolio_reachable(
+    pn: PetriNet,
+    engines: Optional[Sequence[str]] = None,
+    cross_validate: bool = False,
+    validate_budget: float = 5.0,
+    timeout: Optional[float] = None
+) -> PortfolioResult:
+    """
+    Chạy song song các engine (mỗi engine một tiến trình), lấy câu trả lời
+    đầu tiên rồi dừng các engine còn lại.
+    Nếu cross_validate=True, chờ thêm tối đa `validate_budget` giây để các
+    engine khác xong và so sánh số marking.
+    `engines` mặc định là race_engines(pn).
+    """
+    if engines is None:
+        engines = race_engines(pn)
+    for e in engines:
+        if e not in ENGINES:
+            raise ValueError(f"Engine không hợp lệ: {e}")
+
+    out = mp.Queue()
+    procs = {e: mp.Process(target=_worker, args=(e, pn, out), daemon=True) for e in engines}
+    start = time.time()
+    for p in procs.values():
+        p.start()
+
+    result = None
+    counts: Dict[str, int] = {}
+    times: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+    pending = set(engines)
+
+    try:
+        # 1. Chờ câu trả lời thành công đầu tiên
+        deadline = None if timeout is None else start + timeout
+        while pending and result is None:
+            msg = _next_result(out, procs, pending, errors, deadline)
+            if msg is None:
+                break
+            engine, count, elapsed, err = msg
+            pending.discard(engine)
+            if err is not None:
+                errors[engine] = err
+                continue
+            counts[engine] = count
+            times[engine] = elapsed
+            result = PortfolioResult(engine, count, time.time() - start)
+
+        # 2. Kiểm tra chéo trong ngân sách còn lại
+        if result is not None and cross_validate:
+            deadline = time.time() + validate_budget
+            while pending and time.time() < deadline:
+                msg = _next_result(out, procs, pending, errors, deadline)
+                if msg is None:
+                    break
+                engine, count, elapsed, err = msg
+                pending.discard(engine)
+                if err is not None:
+                    errors[engine] = err
+                else:
+                    counts[engine] = count
+                    times[engine] = elapsed
+    finally:
+        # 3. Hủy các engine còn chạy
+        for p in procs.values():
+            if p.is_alive():
+                p.terminate()
+        for p in procs.values():
+            p.join()
+
+    if result is None:
+        raise RuntimeError(f"Không engine nào hoàn thành: {errors or 'timeout'}")
+
+    result.counts = counts
+    result.times = times
+    result.errors = errors
+    if cross_validate and len(counts) > 1:
+        result.agree = len(set(counts.values())) == 1
+    return result
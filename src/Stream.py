@@ -0,0 +1,291 @@
+import os
+import sys
+import time
+from collections.abc import Set
+from dataclasses import dataclass
+from typing import Callable, Generator, Iterator, List, Optional, Tuple
+from .PetriNet import PetriNet, marking_to_int
+from .Backend import BDDBackend, MemoryBudgetExceeded
+from .BDD import build_BDD_dd, image
+
+COMPLETE = "complete"
+BUDGET_EXHAUSTED = "budget_exhausted"
+
+
+@dataclass
+class StreamResult:
+    status: str                     # COMPLETE hoặc BUDGET_EXHAUSTED
+    reason: Optional[str]           # "time" / "states" / "memory" khi hết ngân sách
+    states: int                     # Số trạng thái đã khám phá
+    elapsed: float                  # Thời gian chạy (giây)
+    reached: object = None          # Kết quả (một phần): MarkingSet hoặc BDD node
+
+    @property
+    def exhausted(self) -> bool:
+        return self.status == BUDGET_EXHAUSTED
+
+
+def _rss_mb() -> Optional[float]:
+    """Bộ nhớ RSS hiện tại của tiến trình (MB), None nếu không đọc được."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux trả về KB, macOS trả về byte
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except (ImportError, OSError):
+        return None
+
+
+class Budget:
+    """
+    Ngân sách tài nguyên cho một lần duyệt: thời gian thực, số trạng thái, bộ nhớ.
+    Thời gian được kiểm tra mỗi lần gọi; bộ nhớ (đọc /proc, tốn hơn) chỉ được đo
+    mỗi `check_every` lần gọi để không làm chậm vòng lặp.
+    """
+
+    def __init__(
+        self,
+        max_seconds: Optional[float] = None,
+        max_states: Optional[int] = None,
+        max_memory_mb: Optional[float] = None,
+        check_every: int = 1024
+    ):
+        self.max_seconds = max_seconds
+        self.max_states = max_states
+        self.max_memory_mb = max_memory_mb
+        self.check_every = check_every
+        self.start_time = time.time()
+        self._calls = 0
+
+    def start(self) -> None:
+        self.start_time = time.time()
+        self._calls = 0
+
+    def elapsed(self) -> float:
+        return time.time() - self.start_time
+
+    def exceeded(self, states: int, sample_memory: bool = False) -> Optional[str]:
+        """
+        Trả về lý do hết ngân sách, hoặc None nếu còn.
+        sample_memory=True: đo bộ nhớ ngay lần gọi này (cho vòng lặp ít lần nhưng mỗi lần dài).
+        """
+        if self.max_states is not None and states >= self.max_states:
+            return "states"
+        if self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+            return "time"
+        self._calls += 1
+        if self._calls % self.check_every and not sample_memory:
+            return None
+        if self.max_memory_mb is not None:
+            rss = _rss_mb()
+            if rss is not None and rss >= self.max_memory_mb:
+                return "memory"
+        return None
+
+
+def _decode(state_int: int, num_places: int) -> Tuple[int, ...]:
+    return tuple(1 if (state_int & (1 << i)) else 0 for i in range(num_places))
+
+
+class MarkingSet(Set):
+    """
+    Tập marking đã thăm, giữ nguyên dạng bitmask và chỉ giải mã sang tuple khi
+    được duyệt, nên việc trả kết quả sau khi hết ngân sách không tốn thêm thời gian.
+    Dùng được như set tuple: len, in, for và các phép toán tập hợp.
+    """
+
+    def __init__(self, ints: set, num_places: int):
+        self.ints = ints
+        self.num_places = num_places
+
+    def __len__(self) -> int:
+        return len(self.ints)
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        for s in self.ints:
+            yield _decode(s, self.num_places)
+
+    def __contains__(self, marking) -> bool:
+        if len(marking) != self.num_places:
+            return False
+        return marking_to_int(marking) in self.ints
+
+    @classmethod
+    def _from_iterable(cls, it):
+        return set(it)
+
+
+def bfs_stream(
+    pn: PetriNet,
+    budget: Optional[Budget] = None,
+    batch_size: int = 4096
+) -> Generator[Tuple[int, List[Tuple[int, ...]]], None, StreamResult]:
+    """
+    BFS dạng generator: yield (depth, batch) với batch là các marking mới
+    của tầng `depth` (tối đa `batch_size` marking mỗi lần).
+    Giá trị return của generator là StreamResult (xem `run_stream`).
+    """
+    budget = budget or Budget()
+    budget.start()
+    num_places = len(pn.place_ids)
+    input_masks, output_masks, start_state_int = pn.bitmasks()
+
+    visited_ints = {start_state_int}
+    yield 0, [_decode(start_state_int, num_places)]
+
+    layer = [start_state_int]
+    depth = 0
+    reason = None
+
+    while layer and reason is None:
+        depth += 1
+        next_layer = []
+        batch = []
+
+        for curr in layer:
+            for t in range(len(input_masks)):
+                in_mask = input_masks[t]
+                if (curr & in_mask) == in_mask:
+                    next_state = (curr ^ in_mask) | output_masks[t]
+                    if next_state not in visited_ints:
+                        visited_ints.add(next_state)
+                        next_layer.append(next_state)
+                        batch.append(_decode(next_state, num_places))
+                        if len(batch) >= batch_size:
+                            yield depth, batch
+                            batch = []
+
+            reason = budget.exceeded(len(visited_ints))
+            if reason is not None:
+                break
+
+        if batch:
+            yield depth, batch
+        layer = next_layer
+
+    return StreamResult(
+        status=COMPLETE if reason is None else BUDGET_EXHAUSTED,
+        reason=reason,
+        states=len(visited_ints),
+        elapsed=budget.elapsed(),
+        reached=MarkingSet(visited_ints, num_places),
+    )
+
+
+def dfs_stream(
+    pn: PetriNet,
+    budget: Optional[Budget] = None
+) -> Generator[Tuple[int, ...], None, StreamResult]:
+    """
+    DFS dạng generator: yield từng marking ngay khi được phát hiện.
+    Giá trị return của generator là StreamResult.
+    """
+    budget = budget or Budget()
+    budget.start()
+    num_places = len(pn.place_ids)
+    input_masks, output_masks, start_state_int = pn.bitmasks()
+
+    visited_ints = {start_state_int}
+    stack = [start_state_int]
+    yield _decode(start_state_int, num_places)
+    reason = None
+
+    while stack and reason is None:
+        curr = stack.pop()
+
+        for t in range(len(input_masks)):
+            in_mask = input_masks[t]
+            if (curr & in_mask) == in_mask:
+                next_state = (curr ^ in_mask) | output_masks[t]
+                if next_state not in visited_ints:
+                    visited_ints.add(next_state)
+                    stack.append(next_state)
+                    yield _decode(next_state, num_places)
+
+        reason = budget.exceeded(len(visited_ints))
+
+    return StreamResult(
+        status=COMPLETE if reason is None else BUDGET_EXHAUSTED,
+        reason=reason,
+        states=len(visited_ints),
+        elapsed=budget.elapsed(),
+        reached=MarkingSet(visited_ints, num_places),
+    )
+
+
+def bdd_stream(
+    pn: PetriNet,
+    budget: Optional[Budget] = None,
+    backend: Optional[BDDBackend] = None
+) -> Generator[Tuple[int, object, int], None, StreamResult]:
+    """
+    Reachability bằng BDD dạng generator: sau mỗi vòng lặp yield
+    (step, frontier, total) với frontier là BDD các trạng thái mới
+    và total là số trạng thái đã đạt được tới thời điểm đó.
+    Ngân sách (cả bộ nhớ, bất kể check_every) được kiểm tra sau mỗi vòng
+    (một vòng không bị ngắt giữa chừng);
+    vượt giới hạn node của `backend` cũng được coi là hết ngân sách bộ nhớ.
+    """
+    budget = budget or Budget()
+    budget.start()
+    backend = backend or BDDBackend()
+    bdd = backend.bdd
+    trans_rels, R, x_nodes, xp_nodes = build_BDD_dd(pn, bdd)
+
+    rename_map = {p + "_p": p for p in pn.place_ids}
+    q_vars = set(pn.place_ids)
+    nvars = len(pn.place_ids)
+
+    frontier = R
+    total = int(bdd.count(R, nvars=nvars))
+    step = 0
+    yield step, frontier, total
+    reason = None
+
+    while True:
+        reason = budget.exceeded(total, sample_memory=True)
+        if reason is not None:
+            break
+        try:
+            backend.check()
+        except MemoryBudgetExceeded:
+            reason = "memory"
+            break
+
+        new_states = image(bdd, frontier, trans_rels, q_vars, rename_map) & ~R
+        if new_states == bdd.false:
+            break
+
+        R |= new_states
+        frontier = new_states
+        total = int(bdd.count(R, nvars=nvars))
+        step += 1
+        yield step, frontier, total
+
+    return StreamResult(
+        status=COMPLETE if reason is None else BUDGET_EXHAUSTED,
+        reason=reason,
+        states=total,
+        elapsed=budget.elapsed(),
+        reached=R,
+    )
+
+
+def run_stream(gen: Generator, on_item: Optional[Callable] = None) -> StreamResult:
+    """
+    Chạy hết một stream, gọi `on_item` cho mỗi phần tử được yield,
+    và trả về StreamResult cuối cùng.
+    """
+    while True:
+        try:
+            item = next(gen)
+        except StopIteration as stop:
+            return stop.value
+        if on_item is not None:
+            on_item(item)
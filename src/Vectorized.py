@@ -0,0 +1,89 @@
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from .PetriNet import PetriNet
+
+
+@dataclass
+class VectorizedResult:
+    states: int                                         # Số marking đã đánh giá
+    max_marking: Optional[List[int]] = None             # Marking đạt max c·M (None nếu không có c)
+    max_value: Optional[Union[int, float]] = None
+    deadlocks: List[List[int]] = field(default_factory=list)
+
+
+def _chunks(states: Iterable[Tuple[int, ...]], num_places: int, chunk_size: int) -> Iterator[np.ndarray]:
+    """Chia tập marking thành các ma trận bit (chunk_size x num_places) để giới hạn bộ nhớ."""
+    it = iter(states)
+    while True:
+        block = list(islice(it, chunk_size))
+        if not block:
+            return
+        yield np.array(block, dtype=np.int32).reshape(len(block), num_places)
+
+
+def _enabling_matrices(pn: PetriNet, safe: bool) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Ma trận 0/1 (places x trans) cho input và cho các place output không phải input.
+    Với safe=True, transition chỉ enabled khi các place output đó đang trống
+    (giống định nghĩa 1-safe của deadlock_reachable_marking).
+    """
+    I = (pn.I > 0).astype(np.int32)
+    O = (pn.O > 0).astype(np.int32)
+    in_counts = I.sum(axis=1)
+    blocked = (O & (1 - I)).T if safe else None
+    return I.T, in_counts, blocked
+
+
+def evaluate_states(
+    pn: PetriNet,
+    states: Iterable[Tuple[int, ...]],
+    c: Optional[Sequence[Union[int, float]]] = None,
+    chunk_size: int = 65536,
+    safe: bool = False
+) -> VectorizedResult:
+    """
+    Đánh giá trên tập marking explicit (kết quả của bfs_reachable / dfs_reachable):
+      - c·M cho mọi marking bằng một phép nhân ma trận-vector mỗi chunk,
+      - deadlock: marking mà không transition nào enabled, tính bằng một phép
+        so sánh ma trận với số input của từng transition.
+    Mặc định dùng luật bắn của BFS/DFS (chỉ xét input); safe=True dùng luật của
+    BDD (chặn khi output đã có token), chỉ có nghĩa với tập sinh theo luật đó.
+    """
+    num_places = len(pn.place_ids)
+    I_T, in_counts, blocked = _enabling_matrices(pn, safe)
+    c_vec = None
+    if c is not None:
+        # Giữ kiểu của c: trọng số nguyên -> int64, còn lại (số thực) -> float64
+        c_vec = np.asarray(c)
+        c_vec = c_vec.astype(np.int64 if np.issubdtype(c_vec.dtype, np.integer) else np.float64)
+
+    result = VectorizedResult(states=0)
+    for M in _chunks(states, num_places, chunk_size):
+        result.states += M.shape[0]
+
+        if c_vec is not None:
+            values = M @ c_vec
+            i = int(np.argmax(values))
+            if result.max_value is None or values[i] > result.max_value:
+                result.max_value = values[i].item()
+                result.max_marking = M[i].tolist()
+
+        enabled = (M @ I_T) == in_counts
+        if blocked is not None:
+            enabled &= (M @ blocked) == 0
+        dead = ~enabled.any(axis=1)
+        result.deadlocks.extend(M[dead].tolist())
+
+    return result
+
+
+def compare_deadlocks(vec: VectorizedResult, bdd_deadlocks: Optional[List[List[int]]]) -> Optional[str]:
+    """So sánh tập deadlock với kết quả của BDD, trả về mô tả khác biệt (None nếu khớp)."""
+    explicit_dead = {tuple(m) for m in vec.deadlocks}
+    symbolic_dead = {tuple(m) for m in (bdd_deadlocks or [])}
+    if explicit_dead == symbolic_dead:
+        return None
+    return (f"explicit {len(explicit_dead)} vs BDD {len(symbolic_dead)} deadlocks, "
+            f"{len(explicit_dead ^ symbolic_dead)} differ")
@@ -0,0 +1,88 @@
+from collections import deque
+import numpy as np
+from src.PetriNet import PetriNet
+from src.Coverability import coverability, OMEGA
+
+
+def _net(I, O, M0) -> PetriNet:
+    places = [f"p{i}" for i in range(len(M0))]
+    trans = [f"t{i}" for i in range(len(I))]
+    return PetriNet(places, trans, places, trans, np.array(I), np.array(O), np.array(M0))
+
+
+def _explicit(pn: PetriNet, limit: int = 5000):
+    """Duyệt P/T trực tiếp (số token nguyên), None nếu vượt `limit` marking."""
+    start = tuple(int(v) for v in pn.M0)
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        m = np.array(queue.popleft())
+        for t in range(len(pn.trans_ids)):
+            if (m >= pn.I[t]).all():
+                s = tuple(int(v) for v in m - pn.I[t] + pn.O[t])
+                if s not in seen:
+                    if len(seen) >= limit:
+                        return None
+                    seen.add(s)
+                    queue.append(s)
+    return seen
+
+
+def _maximal(markings):
+    ms = [np.array(m) for m in markings]
+    return {tuple(m) for m in ms if not any((o >= m).all() and (o > m).any() for o in ms)}
+
+
+def test_self_loop_producer_is_unbounded():
+    # t0: p0 -> p0 + p1, p1 tăng vô hạn
+    res = coverability(_net([[1, 0]], [[1, 1]], [1, 0]))
+    assert res.bounds == [1, None]
+    assert not res.bounded and res.encoding() == "unbounded"
+    assert res.unbounded_places == ["p1"]
+    assert [list(m) for m in res.cover_set] == [[1, OMEGA]]
+
+
+def test_bounded_non_safe_net_has_exact_bounds():
+    # p0 có 2 token, t0: p0 -> p1, t1: p1 -> p0
+    res = coverability(_net([[1, 0], [0, 1]], [[0, 1], [1, 0]], [2, 0]))
+    assert res.bounds == [2, 2]
+    assert res.bounded and not res.safe and res.encoding() == "counter"
+    assert res.bits_per_place() == [2, 2]
+
+
+def test_bounds_match_explicit_search_on_models():
+    for name in ("hospital", "hotel"):
+        pn = PetriNet.from_pnml(f"pnml_file/{name}.pnml", safe=False)
+        res = coverability(pn)
+        reach = _explicit(pn)
+        assert reach is not None
+        assert res.bounds == [int(v) for v in np.max(list(reach), axis=0)], name
+        assert {tuple(m) for m in res.cover_set} == _maximal(reach), name
+
+
+def test_bundled_safe_models_use_bitmask_encoding():
+    for name in ("fsm", "philo6", "philo12"):
+        res = coverability(PetriNet.from_pnml(f"pnml_file/{name}.pnml", safe=False))
+        assert res.complete and res.safe and res.encoding() == "bitmask", name
+
+
+def test_random_nets_against_explicit_search():
+    rng = np.random.default_rng(7)
+    for _ in range(60):
+        num_places, num_trans = rng.integers(2, 5), rng.integers(1, 5)
+        I = rng.integers(0, 2, size=(num_trans, num_places)) * rng.integers(1, 3, size=(num_trans, num_places))
+        O = rng.integers(0, 2, size=(num_trans, num_places)) * rng.integers(1, 3, size=(num_trans, num_places))
+        M0 = rng.integers(0, 3, size=num_places)
+        pn = _net(I, O, M0)
+        res = coverability(pn)
+        reach = _explicit(pn)
+        # Mọi marking reachable đều bị phủ bởi tập phủ
+        for m in list(reach or [])[:500]:
+            assert (res.cover_set >= np.array(m)).all(axis=1).any()
+        if reach is not None:
+            # Mạng bị chặn: tập phủ tối tiểu là tập marking reachable tối đại
+            assert res.bounded
+            assert {tuple(m) for m in res.cover_set} == _maximal(reach)
+        else:
+            # Vượt 5000 marking với tối đa 4 place: có place không bị chặn
+            assert not res.bounded
@@ -0,0 +1,43 @@
+import numpy as np
+from src.PetriNet import PetriNet
+from src.CTL import CTLChecker
+
+
+def _chain_net() -> PetriNet:
+    # p0 -t0-> p1, p1 là deadlock, p2 không bao giờ có token
+    I = np.array([[1, 0, 0]])
+    O = np.array([[0, 1, 0]])
+    return PetriNet(["p0", "p1", "p2"], ["t0"], ["p0", "p1", "p2"], ["t0"], I, O, np.array([1, 0, 0]))
+
+
+def test_deadlock_ends_path_for_eventually():
+    ctl = CTLChecker(_chain_net())
+    assert ctl.check(("EF", "deadlock"))
+    assert not ctl.check(("AF", "p2"))
+    assert not ctl.check(("AU", "true", "p2"))
+    assert ctl.check(("AF", "p1"))
+    assert ctl.check(("AU", "p0", "p1"))
+
+
+def test_deadlock_behaves_as_self_loop():
+    ctl = CTLChecker(_chain_net())
+    assert ctl.check(("EG", ("not", "p2")))
+    assert ctl.check(("AG", ("implies", "p1", ("AX", "p1"))))
+    assert ctl.check(("AG", ("implies", "p1", ("EX", "p1"))))
+    assert ctl.check(("AF", ("AG", "p1")))
+
+
+def test_fsm_liveness_with_reachable_deadlocks():
+    pn = PetriNet.from_pnml("pnml_file/fsm.pnml")
+    ctl = CTLChecker(pn)
+    assert ctl.check(("EF", "deadlock"))
+    # Deadlock reachable trước khi Done_A1 có token -> AF Done_A1 không thể đúng
+    assert ctl.check(("EF", ("and", "deadlock", ("not", "Done_A1"))))
+    assert not ctl.check(("AF", "Done_A1"))
+
+
+def test_nested_list_formula():
+    pn = PetriNet.from_pnml("pnml_file/fsm.pnml")
+    ctl = CTLChecker(pn)
+    assert ctl.check(["AG", ["EF", "Done_*"]]) == ctl.check(("AG", ("EF", "Done_*")))
+    assert ctl.check(("EF", ["and", "Done_A1", ["not", "deadlock"]])) == ctl.check(("EF", ("and", "Done_A1", ("not", "deadlock"))))
@@ -0,0 +1,39 @@
+import numpy as np
+from src.PetriNet import PetriNet
+from src.BDD import bdd_reachable
+from src.Deadlock import (
+    deadlock_reachable_marking, structural_deadlock_check, state_equation_deadlock,
+    DEADLOCK_FREE, INCONCLUSIVE,
+)
+
+
+def _net(I, O, M0) -> PetriNet:
+    places = [f"p{i}" for i in range(len(M0))]
+    trans = [f"t{i}" for i in range(len(I))]
+    return PetriNet(places, trans, places, trans, np.array(I), np.array(O), np.array(M0))
+
+
+def test_weighted_arc_is_not_proved_deadlock_free():
+    # t0 lấy 2 token từ p0 và đặt 1 token vào p1; các engine coi arc là trọng số 1
+    pn = _net([[2, 0]], [[0, 1]], [1, 0])
+    assert state_equation_deadlock(pn) == (INCONCLUSIVE, None)
+    status, _ = structural_deadlock_check(pn)
+    assert status != DEADLOCK_FREE
+    R, _ = bdd_reachable(pn)
+    assert sorted(deadlock_reachable_marking(pn, R)) == [[0, 1], [1, 0]]
+
+
+def test_cycle_is_deadlock_free():
+    pn = _net([[1, 0], [0, 1]], [[0, 1], [1, 0]], [1, 0])
+    assert structural_deadlock_check(pn) == (DEADLOCK_FREE, None)
+    R, _ = bdd_reachable(pn)
+    assert deadlock_reachable_marking(pn, R) is None
+
+
+def test_structural_check_agrees_with_bdd_on_models():
+    for name in ("fsm", "hospital", "hotel", "philo6"):
+        pn = PetriNet.from_pnml(f"pnml_file/{name}.pnml")
+        status, _ = structural_deadlock_check(pn)
+        if status == DEADLOCK_FREE:
+            R, _ = bdd_reachable(pn)
+            assert deadlock_reachable_marking(pn, R) is None, name
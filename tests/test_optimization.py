@@ -0,0 +1,38 @@
+import numpy as np
+from src.PetriNet import PetriNet
+from src.BDD import bdd_reachable
+from src.Optimization import top_k_reachable_markings, pareto_reachable_markings
+
+
+def _brute_force(pn, R):
+    """Mọi marking của BDD reachable, liệt kê trực tiếp."""
+    care = set(pn.place_ids)
+    return [[int(a[p]) for p in pn.place_ids] for a in R.bdd.pick_iter(R, care_vars=care)]
+
+
+def test_top_k_matches_brute_force_on_hospital():
+    pn = PetriNet.from_pnml("pnml_file/hospital.pnml")
+    R, count = bdd_reachable(pn)
+    markings = _brute_force(pn, R)
+    assert len(markings) == count
+    rng = np.random.default_rng(0)
+    c = rng.integers(-5, 6, size=len(pn.place_ids))
+    k = 10
+    res = top_k_reachable_markings(pn.place_ids, R, c, k)
+    expected = sorted((int(np.dot(c, m)) for m in markings), reverse=True)[:k]
+    assert [v for _, v in res] == expected
+    assert all(int(np.dot(c, m)) == v and m in markings for m, v in res)
+
+
+def test_pareto_matches_brute_force_on_hospital():
+    pn = PetriNet.from_pnml("pnml_file/hospital.pnml")
+    R, _ = bdd_reachable(pn)
+    markings = _brute_force(pn, R)
+    rng = np.random.default_rng(1)
+    C = rng.integers(-3, 4, size=(2, len(pn.place_ids)))
+    points = {tuple(int(v) for v in C @ m) for m in markings}
+    expected = {p for p in points
+                if not any(q != p and all(a >= b for a, b in zip(q, p)) for q in points)}
+    front = pareto_reachable_markings(pn.place_ids, R, C)
+    assert {tuple(v) for _, v in front} == expected
+    assert all(list(C @ m) == v and m in markings for m, v in front)
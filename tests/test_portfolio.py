@@ -0,0 +1,19 @@
+from src.PetriNet import PetriNet
+from src.BFS import bfs_reachable
+from src.BDD import bdd_reachable
+from src.Portfolio import ENGINES, race_engines
+
+
+def test_race_only_engines_with_the_same_answer():
+    for name in ("fsm", "hospital", "hotel", "philo6"):
+        pn = PetriNet.from_pnml(f"pnml_file/{name}.pnml")
+        engines = race_engines(pn)
+        if "bdd" in engines:
+            assert bdd_reachable(pn)[1] == len(bfs_reachable(pn)), name
+        else:
+            assert engines == ("bfs", "dfs")
+
+
+def test_bdd_raced_on_safe_models_only():
+    assert race_engines(PetriNet.from_pnml("pnml_file/fsm.pnml")) == ENGINES
+    assert "bdd" not in race_engines(PetriNet.from_pnml("pnml_file/hospital.pnml"))
@@ -0,0 +1,20 @@
+from src.PetriNet import PetriNet
+from src.BFS import bfs_reachable
+from src.Stream import Budget, MarkingSet, bfs_stream, dfs_stream, run_stream, BUDGET_EXHAUSTED
+
+
+def test_stream_result_matches_bfs():
+    pn = PetriNet.from_pnml("pnml_file/fsm.pnml")
+    expected = bfs_reachable(pn)
+    for gen in (bfs_stream(pn), dfs_stream(pn)):
+        res = run_stream(gen)
+        assert isinstance(res.reached, MarkingSet)
+        assert res.reached == expected
+        assert all(m in res.reached for m in expected)
+
+
+def test_exhausted_stream_keeps_partial_set_undecoded():
+    pn = PetriNet.from_pnml("pnml_file/philo6.pnml")
+    res = run_stream(dfs_stream(pn, Budget(max_states=50)))
+    assert res.status == BUDGET_EXHAUSTED and res.reason == "states"
+    assert len(res.reached) == res.states == len(set(res.reached))
@@ -0,0 +1,34 @@
+import numpy as np
+from src.PetriNet import PetriNet
+from src.Vectorized import evaluate_states
+
+
+def _choice_net() -> PetriNet:
+    # p0 -t0-> p1 hoặc p0 -t1-> p2
+    I = np.array([[1, 0, 0], [1, 0, 0]])
+    O = np.array([[0, 1, 0], [0, 0, 1]])
+    return PetriNet(["p0", "p1", "p2"], ["t0", "t1"], ["p0", "p1", "p2"], ["t0", "t1"], I, O, np.array([1, 0, 0]))
+
+
+def test_fractional_weights_are_not_truncated():
+    states = [(1, 0, 0), (0, 1, 0), (0, 0, 1)]
+    r = evaluate_states(_choice_net(), states, [0.1, 0.4, 0.6])
+    assert r.max_value == 0.6
+    assert r.max_marking == [0, 0, 1]
+
+
+def test_integer_weights_stay_integer():
+    states = [(1, 0, 0), (0, 1, 0), (0, 0, 1)]
+    r = evaluate_states(_choice_net(), states, [3, 1, 2])
+    assert r.max_value == 3 and isinstance(r.max_value, int)
+    assert sorted(r.deadlocks) == [[0, 0, 1], [0, 1, 0]]
+
+
+def test_deadlocks_use_the_explicit_engine_firing_rule():
+    from src.BFS import bfs_reachable
+    pn = PetriNet.from_pnml("pnml_file/hospital.pnml")
+    states = bfs_reachable(pn)
+    # Luật của BFS: transition enabled khi mọi place input có token
+    inputs = [np.nonzero(pn.I[t] > 0)[0] for t in range(len(pn.trans_ids))]
+    expected = sorted(list(m) for m in states if not any(all(m[p] for p in ins) for ins in inputs))
+    assert sorted(evaluate_states(pn, states).deadlocks) == expected
@@ -0,0 +1,27 @@
+import json
+from src.PetriNet import PetriNet
+from src.BDD import bdd_reachable
+from src.Optimization import max_reachable_marking
+from run import get_weight_vector
+
+
+def test_fractional_weights_in_both_json_forms(tmp_path):
+    pn = PetriNet.from_pnml("pnml_file/fsm.pnml")
+    as_dict = tmp_path / "dict.json"
+    as_dict.write_text(json.dumps({"Done_A1": 2.5, "Start_A1": -0.5}))
+    c = get_weight_vector(pn, "fsm.pnml", str(as_dict))
+    as_list = tmp_path / "list.json"
+    as_list.write_text(json.dumps(c.tolist()))
+    assert get_weight_vector(pn, "fsm.pnml", str(as_list)).tolist() == c.tolist()
+    assert c[pn.place_names.index("Done_A1")] == 2.5
+    assert c[pn.place_names.index("Start_A1")] == -0.5
+
+    R, _ = bdd_reachable(pn)
+    _, value = max_reachable_marking(pn.place_ids, R, c)
+    assert value == 2.5
+
+
+def test_integer_weights_stay_integer():
+    pn = PetriNet.from_pnml("pnml_file/fsm.pnml")
+    c = get_weight_vector(pn, "pnml_file/fsm.pnml")
+    assert c.dtype.kind == "i"